@@ -1,5 +1,7 @@
 from django.contrib import admin
 
-from .models import Alert
+from .models import Alert, AlertEvent, OutboxMessage
 
 admin.site.register(Alert)
+admin.site.register(AlertEvent)
+admin.site.register(OutboxMessage)
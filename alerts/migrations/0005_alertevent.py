@@ -0,0 +1,74 @@
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Django cannot create partitioned tables, so the table is created here and
+# the model state is declared separately. Partitions are created per month
+# by the scanners (scripts/common/partitions.py) before they write.
+CREATE_ALERT_EVENT = """
+CREATE TABLE alerts_alertevent (
+    id bigserial NOT NULL,
+    stock_id varchar(10) NOT NULL
+        REFERENCES stocks_stock (ticker) DEFERRABLE INITIALLY DEFERRED,
+    alert_name varchar(50) NOT NULL,
+    alert_datetime timestamp with time zone NOT NULL,
+    data jsonb NOT NULL,
+    created_at timestamp with time zone NOT NULL,
+    PRIMARY KEY (id, alert_datetime)
+) PARTITION BY RANGE (alert_datetime);
+
+CREATE INDEX alerts_event_datetime_brin
+    ON alerts_alertevent USING brin (alert_datetime);
+CREATE INDEX alerts_event_stock_idx
+    ON alerts_alertevent (stock_id, alert_datetime);
+"""
+
+DROP_ALERT_EVENT = "DROP TABLE alerts_alertevent;"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("stocks", "0002_content_hash"),
+        ("alerts", "0004_outboxmessage"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(CREATE_ALERT_EVENT, DROP_ALERT_EVENT),
+            ],
+            state_operations=[
+                migrations.CreateModel(
+                    name="AlertEvent",
+                    fields=[
+                        ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                        ("alert_name", models.CharField(max_length=50)),
+                        ("alert_datetime", models.DateTimeField()),
+                        ("data", models.JSONField()),
+                        ("created_at", models.DateTimeField(auto_now_add=True)),
+                        (
+                            "stock",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="alert_events",
+                                to="stocks.stock",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "indexes": [
+                            django.contrib.postgres.indexes.BrinIndex(
+                                fields=["alert_datetime"],
+                                name="alerts_event_datetime_brin",
+                            ),
+                            models.Index(
+                                fields=["stock", "alert_datetime"],
+                                name="alerts_event_stock_idx",
+                            ),
+                        ],
+                    },
+                ),
+            ],
+        ),
+    ]
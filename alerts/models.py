@@ -1,3 +1,4 @@
+from django.contrib.postgres.indexes import BrinIndex
 from django.db import models
 
 
@@ -16,3 +17,75 @@ class Alert(models.Model):
 
     def __str__(self):
         return f"{self.alert_name} {self.stock.ticker}"
+
+
+class AlertEvent(models.Model):
+    """
+    Append-only history of every alert a scanner sent. Alert only keeps
+    the latest trigger per stock and alert name.
+
+    The table is range partitioned by month on alert_datetime (see
+    migration 0005), so its primary key is (id, alert_datetime) in the
+    database. Old months are removed by dropping their partition.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    stock = models.ForeignKey(
+        "stocks.Stock", related_name="alert_events", on_delete=models.CASCADE
+    )
+    alert_name = models.CharField(max_length=50)
+    alert_datetime = models.DateTimeField()
+    data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            BrinIndex(fields=["alert_datetime"], name="alerts_event_datetime_brin"),
+            models.Index(
+                fields=["stock", "alert_datetime"], name="alerts_event_stock_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.alert_name} {self.stock_id} {self.alert_datetime}"
+
+
+class OutboxMessage(models.Model):
+    """
+    Rendered Discord message waiting for delivery. Scanners write these in
+    the same transaction as their alerts and the outbox worker posts them.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    scanner = models.CharField(max_length=100)
+    webhook_url = models.CharField(max_length=255)
+    payload = models.JSONField()
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    # Pending messages are claimable from this time on
+    available_at = models.DateTimeField()
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["available_at", "id"],
+                name="alerts_outbox_pending_idx",
+                condition=models.Q(status="pending"),
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.scanner} {self.status} #{self.pk}"
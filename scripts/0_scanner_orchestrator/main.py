@@ -0,0 +1,103 @@
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from common.discord import get_async_dispatcher
+from common.scanners import load_scanner_classes
+from common.universe import get_typed_universe_snapshot
+from common.utils import SharedDBConnection
+
+# Comma separated bot directories or class names, all scanners when empty
+ORCHESTRATOR_SCANNERS = os.getenv("ORCHESTRATOR_SCANNERS") or ""
+# Scanners running at once
+ORCHESTRATOR_WORKERS = int(os.getenv("ORCHESTRATOR_WORKERS") or 4)
+
+
+class ScannerOrchestrator:
+    """
+    Runs several scanners in one process, sharing what each Cloud Function
+    would otherwise set up on its own: the HTTP session (process-wide
+    already), one database connection, the parsed universe snapshot and
+    the Discord dispatch queue.
+    """
+
+    def __init__(self, names=None, max_workers=ORCHESTRATOR_WORKERS):
+        self.scanner_classes = load_scanner_classes(names or None)
+        self.max_workers = max_workers
+
+    def create_scanners(self, database):
+        scanners = []
+        for scanner_class in self.scanner_classes:
+            scanner = scanner_class()
+            scanner.db_connection = database
+            # The universe is downloaded once for all of them
+            scanner.use_universe = True
+            # Deliveries of all scanners overlap and are awaited once
+            if scanner.delivery == "sync":
+                scanner.delivery = "async"
+            scanner.wait_for_delivery = False
+            scanners.append(scanner)
+        return scanners
+
+    def run_one(self, scanner):
+        started = time.perf_counter()
+        scanner.run_scanner()
+        return time.perf_counter() - started
+
+    def run(self):
+        started = time.perf_counter()
+        database = SharedDBConnection()
+        scanners = self.create_scanners(database)
+        stats = {"scanners": {}, "failed": []}
+
+        if scanners:
+            # Download and type the universe once, before the scanners race for it
+            get_typed_universe_snapshot(scanners[0].FINVIZ_EMAIL, scanners[0].process_columns)
+
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="scanner"
+            ) as executor:
+                futures = {
+                    executor.submit(self.run_one, scanner): type(scanner).__name__
+                    for scanner in scanners
+                }
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        stats["scanners"][name] = round(future.result(), 3)
+                    except Exception as e:
+                        logging.error(f"{name} failed: {e}")
+                        stats["failed"].append(name)
+
+            if any(scanner.delivery == "async" for scanner in scanners):
+                get_async_dispatcher().drain()
+        finally:
+            database.close()
+
+        stats["seconds"] = round(time.perf_counter() - started, 3)
+        print(
+            f"Ran {len(stats['scanners'])} scanners in {stats['seconds']}s, "
+            f"{len(stats['failed'])} failed"
+        )
+        return stats
+
+
+def requested_scanners(request):
+    """Scanner names from the request's JSON body, else ORCHESTRATOR_SCANNERS"""
+    body = request.get_json(silent=True) if hasattr(request, "get_json") else None
+    names = (body or {}).get("scanners") or ORCHESTRATOR_SCANNERS.split(",")
+    return [name.strip() for name in names if name.strip()]
+
+
+def main(request):
+    orchestrator = ScannerOrchestrator(requested_scanners(request))
+    stats = orchestrator.run()
+    if stats["failed"]:
+        return f"Scanners failed: {', '.join(stats['failed'])}", 500
+    return "Scanner orchestrator completed successfully", 200
+
+
+if __name__ == "__main__":
+    main("")
@@ -1,7 +1,17 @@
-import json
 from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
+
+import pandas as pd
 
 from common.base_scanner import BaseScanner
+from common.buckets import (
+    MARKET_CAP_BUCKETS,
+    group_by_market_cap,
+    label_by_market_cap,
+    market_cap_billions,
+)
+from common.utils import to_json
 
 
 class StrongEarningsScanner(BaseScanner):
@@ -9,11 +19,8 @@ class StrongEarningsScanner(BaseScanner):
         super().__init__(
             "1330090697310736405/R4q5uJoRPg-SupNZB3bSZgq94RXttYsiunDUn7tKxDQy7F9rDxz-Jg-rXz9c1kjnrKV1"
         )
-        self.MARKET_CAP_RANGES = {
-            "Small Cap": (0, 2000),
-            "Mid Cap": (2000, 10000),
-            "Large Cap": (10000, float("inf")),
-        }
+        # Market cap ranges in USD
+        self.MARKET_CAP_RANGES = MARKET_CAP_BUCKETS
 
     def get_filter_params(self):
         return "earningsdate_prevdays5,sh_avgvol_o500,sh_curvol_o500,sh_price_u50,sh_relvol_o1,ta_perf_1wup"
@@ -21,44 +28,35 @@ class StrongEarningsScanner(BaseScanner):
     def get_alert_type(self):
         return "Strong Post-Earnings Alert"
 
-    def process_data(self, df):
+    def transform(self, df):
+        df = super().transform(df)
         df["Volume Ratio"] = df["Volume"] / df["Average Volume"]
-        categorized_stocks = {
-            cap_type: [] for cap_type in self.MARKET_CAP_RANGES.keys()
-        }
-
-        df = self.process_columns(df)
+        df["cap_type"] = label_by_market_cap(df, self.MARKET_CAP_RANGES)
+        return df
 
-        for _, stock in df.iterrows():
-            for cap_type, (min_cap, max_cap) in self.MARKET_CAP_RANGES.items():
-                if min_cap <= stock["Market Cap"] < max_cap:
-                    processed_stock = self.get_processed_stock(stock)
-                    processed_stock["cap_type"] = cap_type
-                    categorized_stocks[cap_type].append(processed_stock)
-                    break
+    def select(self, df):
+        # Stocks in market cap range order, those outside every range are not reported
+        grouped = group_by_market_cap(df, self.MARKET_CAP_RANGES)
+        return super().select(pd.concat(grouped.values()))
 
-        return categorized_stocks
-
-    def get_alert_data(self, stock, cap_type):
-        return json.dumps(
+    def get_alert_data(self, stock):
+        return to_json(
             {
                 "price": stock["Price"],
                 "volume": stock["Volume"],
                 "avg_volume": stock["Average Volume"],
                 "rel_volume": stock["Relative Volume"],
                 "market_cap": stock["Market Cap"],
-                "cap_type": cap_type,
+                "cap_type": stock["cap_type"],
                 "eps_ttm": stock["EPS (ttm)"],
                 "week_performance": stock["Performance (Week)"],
             }
         )
 
-    def create_discord_alert(self, categorized_stocks):
-        for cap_type, stocks in categorized_stocks.items():
-            if not stocks:
-                continue
-
-            for stock in stocks:
+    def create_discord_alert(self, stocks):
+        # select ordered the stocks by market cap range
+        for cap_type, cap_stocks in groupby(stocks, key=itemgetter("cap_type")):
+            for stock in cap_stocks:
                 # Convert values to float if they're strings
                 price = (
                     float(stock["Price"])
@@ -84,7 +82,7 @@ class StrongEarningsScanner(BaseScanner):
                         f"• P/FCF: {stock['P/Free Cash Flow']:.2f} 💰\n\n"
                         "**📈 Trading Data:**\n"
                         f"• Volume: {stock['Volume']:,} | RVOL: {stock['Relative Volume']:.2f}x\n"
-                        f"• Market Cap: ${stock['Market Cap'] / 1e9:.2f}B | P/E: {stock['P/E']:.2f}\n"
+                        f"• Market Cap: ${market_cap_billions(stock['Market Cap']):.2f}B | P/E: {stock['P/E']:.2f}\n"
                         f"• Sector: {stock['Sector']} | Industry: {stock['Industry']}\n\n"
                         f"• Country: {stock['Country']} 🌍\n\n"
                     ),
@@ -1,10 +1,15 @@
-import json
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from common.base_scanner import BaseScanner
+from common.suppression import Realert
+from common.utils import to_json
 
 
 class MomentumGapScanner(BaseScanner):
+    # Re-alert within the cooldown only when the gap grew or shrank 5 points
+    COOLDOWN = timedelta(days=3)
+    REALERT_ON = [Realert("Change", "change", 0.05)]
+
     def __init__(self):
         super().__init__(
             "1326541823015125083/gxhiputXu61PQ4iEvAhkIeMjGbtLd3FW17VarbK6BUgKkNkME0SINQM3UvjU47QGuMUQ"
@@ -16,19 +21,13 @@ class MomentumGapScanner(BaseScanner):
     def get_alert_type(self):
         return "Momentum Gap Alert"
 
-    def process_data(self, df):
+    def transform(self, df):
+        df = super().transform(df)
         df["Volume Ratio"] = df["Volume"] / df["Average Volume"]
-        df = self.process_columns(df)
-
-        processed_stocks = []
-        for _, stock in df.iterrows():
-            processed_stock = self.get_processed_stock(stock)
-            processed_stocks.append(processed_stock)
-
-        return processed_stocks
+        return df
 
     def get_alert_data(self, stock):
-        return json.dumps(
+        return to_json(
             {
                 "price": stock["Price"],
                 "change": stock["Change"],
@@ -1,10 +1,19 @@
-import json
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from common.base_scanner import BaseScanner
+from common.suppression import Realert
+from common.utils import to_json
 
 
 class ShortSqueezeScanner(BaseScanner):
+    # Re-alert within the cooldown when the short float moved 5 points or
+    # the price 10%
+    COOLDOWN = timedelta(days=3)
+    REALERT_ON = [
+        Realert("Short Float", "short_float", 0.05),
+        Realert("Price", "price", 0.10, relative=True),
+    ]
+
     def __init__(self):
         super().__init__(
             "1326542336720764938/EM4yx4jakMGqkkTmUAEJ0spC9P0_o2hh3amUKnA4weTJYOLSZjGkDzDEzRe_e9i1hTKe"
@@ -17,19 +26,13 @@ class ShortSqueezeScanner(BaseScanner):
     def get_alert_type(self):
         return "Short Squeeze Alert"
 
-    def process_data(self, df):
+    def transform(self, df):
+        df = super().transform(df)
         df["Volume Ratio"] = df["Volume"] / df["Average Volume"]
-        df = self.process_columns(df)
-
-        processed_stocks = []
-        for _, stock in df.iterrows():
-            processed_stock = self.get_processed_stock(stock)
-            processed_stocks.append(processed_stock)
-
-        return processed_stocks
+        return df
 
     def get_alert_data(self, stock):
-        return json.dumps(
+        return to_json(
             {
                 "price": stock["Price"],
                 "change": stock["Change"],
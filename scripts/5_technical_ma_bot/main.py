@@ -1,10 +1,13 @@
-import json
 from datetime import datetime
 
 from common.base_scanner import BaseScanner
+from common.utils import to_json
 
 
 class TechnicalMAScanner(BaseScanner):
+    # Alert again when the quarterly or yearly trend moved noticeably
+    DIFF_COLUMNS = {"Performance (Quarter)": 0.05, "Performance (Year)": 0.10}
+
     def __init__(self):
         super().__init__(
             "1326542555566968832/9DE3ya_4uq5-ioREY69XAYJROLvMToPvCOwObAn1zZVZr_asctl5_4uVjASSowbbM8iF"
@@ -20,19 +23,13 @@ class TechnicalMAScanner(BaseScanner):
     def get_alert_type(self):
         return "Technical MA Alert"
 
-    def process_data(self, df):
+    def transform(self, df):
+        df = super().transform(df)
         df["Volume Ratio"] = df["Volume"] / df["Average Volume"]
-        df = self.process_columns(df)
-
-        processed_stocks = []
-        for _, stock in df.iterrows():
-            processed_stock = self.get_processed_stock(stock)
-            processed_stocks.append(processed_stock)
-
-        return processed_stocks
+        return df
 
     def get_alert_data(self, stock):
-        return json.dumps(
+        return to_json(
             {
                 "price": stock["Price"],
                 "change": stock["Change"],
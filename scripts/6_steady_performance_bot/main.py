@@ -1,10 +1,13 @@
-import json
 from datetime import datetime
 
 from common.base_scanner import BaseScanner
+from common.utils import to_json
 
 
 class SteadyPerformanceScanner(BaseScanner):
+    # Alert again when the trend or momentum moved noticeably
+    DIFF_COLUMNS = {"Performance (Quarter)": 0.05, "Relative Strength Index (14)": 10}
+
     def __init__(self):
         super().__init__(
             "1326543155255840810/tMCyUfXq4rABkumgm9bJyBGYn5M6vo_UdGYDsFja8csaOeOTh4xF5mHPquI2115R-4Ui"
@@ -22,19 +25,13 @@ class SteadyPerformanceScanner(BaseScanner):
     def get_alert_type(self):
         return "Steady Performance Alert"
 
-    def process_data(self, df):
+    def transform(self, df):
+        df = super().transform(df)
         df["Volume Ratio"] = df["Volume"] / df["Average Volume"]
-        df = self.process_columns(df)
-
-        processed_stocks = []
-        for _, stock in df.iterrows():
-            processed_stock = self.get_processed_stock(stock)
-            processed_stocks.append(processed_stock)
-
-        return processed_stocks
+        return df
 
     def get_alert_data(self, stock):
-        return json.dumps(
+        return to_json(
             {
                 "price": stock["Price"],
                 "change": stock["Change"],
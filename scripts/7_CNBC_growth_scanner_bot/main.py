@@ -1,10 +1,16 @@
-import json
 from datetime import datetime
 
 from common.base_scanner import BaseScanner
+from common.utils import to_json
 
 
 class CNBCGrowthScanner(BaseScanner):
+    # Alert again when a new quarter changed the reported growth
+    DIFF_COLUMNS = {
+        "Sales growth quarter over quarter": 0.05,
+        "EPS growth this year": 0.05,
+    }
+
     def __init__(self):
         super().__init__(
             "1326543415206215764/C-2LturhAi2tMe6A9XtI0K__6l9hcO0DZpfASevvUzW0kYWvLvB-AqEhEDm8nGZ73XNo"
@@ -22,25 +28,20 @@ class CNBCGrowthScanner(BaseScanner):
     def get_alert_type(self):
         return "CNBC Growth Alert"
 
-    def process_data(self, df):
+    def transform(self, df):
+        df = super().transform(df)
         df["Volume Ratio"] = df["Volume"] / df["Average Volume"]
-        df = self.process_columns(df)
-
-        processed_stocks = []
-        for _, stock in df.iterrows():
-            # Only process stocks meeting the
-            # Sales growth quarter-over-quarter criteria
-            if stock["Sales growth quarter over quarter"] > 15:
-                processed_stock = self.get_processed_stock(stock)
-                processed_stock["sales_qoq_growth"] = stock[
-                    "Sales growth quarter over quarter"
-                ]
-                processed_stocks.append(processed_stock)
+        df["sales_qoq_growth"] = df["Sales growth quarter over quarter"]
+        return df
 
-        return processed_stocks
+    def select(self, df):
+        # Only process stocks meeting the
+        # Sales growth quarter-over-quarter criteria
+        df = df[df["Sales growth quarter over quarter"] > 15]
+        return super().select(df)
 
     def get_alert_data(self, stock):
-        return json.dumps(
+        return to_json(
             {
                 "price": stock["Price"],
                 "change": stock["Change"],
@@ -0,0 +1,74 @@
+import os
+import time
+
+import requests
+from common.discord import post_webhook
+from common.outbox import (
+    claim_messages,
+    is_permanent_failure,
+    mark_failed,
+    mark_sent,
+)
+from common.utils import DBConnection
+
+# Stop claiming new batches after this many seconds, so that a run ends
+# before the next scheduled one starts
+OUTBOX_WORKER_SECONDS = float(os.getenv("OUTBOX_WORKER_SECONDS") or 50)
+
+
+class OutboxWorker:
+    """Delivers the Discord messages scanners stored in the outbox"""
+
+    def __init__(self, time_budget=OUTBOX_WORKER_SECONDS):
+        self.time_budget = time_budget
+
+    def deliver(self, webhook_url, payload):
+        """
+        Post one message.
+        Returns:
+            tuple: The error text (None on success) and whether retrying
+                cannot help, as for a 4xx answer other than 429.
+        """
+        try:
+            response = post_webhook(webhook_url, payload)
+        except requests.exceptions.RequestException as e:
+            return str(e), False
+        if response.ok:
+            return None, False
+        error = f"{response.status_code}: {response.text[:500]}"
+        return error, is_permanent_failure(response.status_code)
+
+    def run(self):
+        started = time.monotonic()
+        stats = {"sent": 0, "failed": 0}
+
+        with DBConnection() as connection:
+            with connection.cursor() as cursor:
+                while time.monotonic() - started < self.time_budget:
+                    messages = claim_messages(connection, cursor)
+                    if not messages:
+                        break
+
+                    for message_id, webhook_url, payload, attempts in messages:
+                        error, permanent = self.deliver(webhook_url, payload)
+                        if error is None:
+                            mark_sent(connection, cursor, message_id)
+                            stats["sent"] += 1
+                        else:
+                            mark_failed(
+                                connection, cursor, message_id, attempts, error, permanent
+                            )
+                            stats["failed"] += 1
+
+        print(f"Outbox worker sent {stats['sent']} messages, {stats['failed']} failed")
+        return stats
+
+
+def main(request):
+    worker = OutboxWorker()
+    stats = worker.run()
+    return f"Outbox worker sent {stats['sent']} messages", 200
+
+
+if __name__ == "__main__":
+    main("")
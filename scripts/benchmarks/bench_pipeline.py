@@ -0,0 +1,232 @@
+"""
+Time every stage of the scanner pipeline on synthetic Finviz exports.
+
+    python -m benchmarks.bench_pipeline [--rows 100 1000 10000 50000]
+        [--scanners 3_momentum_gap_bot ...] [--repeat 3] [--screened]
+        [--output bench.json]
+
+The database stage only runs when DB_HOST is set. It writes into temporary
+copies of the target tables, so the real tables are never modified. Both
+upsert methods (execute_values and COPY into a staging table) are timed,
+each inserting into empty tables and then upserting the same rows again; compare them
+at 10k-100k rows with --rows 10000 50000 100000.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+
+import pandas as pd
+from benchmarks.fixtures import generate_finviz_csv
+from common.base_scanner import BaseScanner
+from common.columns import read_finviz_csv
+from common.extra_utils import (
+    UPSERT_METHODS,
+    bulk_upsert_alerts,
+    bulk_upsert_stock_info,
+    bulk_upsert_stocks,
+)
+from common.finviz_filters import UnsupportedFilterError
+from common.scanners import load_scanner_classes
+from common.utils import DBConnection
+
+DEFAULT_ROWS = [100, 1000, 10000, 50000]
+BENCH_TABLES = ["stocks_stock", "stocks_stockinfo", "alerts_alert"]
+
+
+def timed(function, repeat):
+    """Run function `repeat` times, returning (timings, last result)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = function()
+        timings.append(time.perf_counter() - started)
+    return timings, result
+
+
+def record(results, rows, stage, timings, scanner=None, items=None):
+    results.append(
+        {
+            "rows": rows,
+            "scanner": scanner,
+            "stage": stage,
+            "items": items,
+            "seconds_min": round(min(timings), 6),
+            "seconds_median": round(statistics.median(timings), 6),
+            "repeat": len(timings),
+        }
+    )
+
+
+def count_payloads():
+    payloads = []
+    return payloads, lambda scanner, payload: payloads.append(payload)
+
+
+def send_alerts(scanner, stocks):
+    scanner.create_discord_alert(stocks)
+    scanner.flush_discord_messages()
+
+
+def build_records(typed):
+    stocks, stock_info = BaseScanner("").prepare_base_records(typed)
+    return list(zip(stocks, stock_info))
+
+
+def bench_upserts(records, repeat):
+    """
+    Time the upserts of every method ("values" and "copy") against
+    temporary copies of the tables
+    """
+    stocks = [stock for stock, _ in records]
+    stock_info = [info for _, info in records]
+    alerts = [
+        (stock[0], "Benchmark Alert", "NOW()", "{}", "NOW()", "NOW()")
+        for stock in stocks
+    ]
+
+    upserts = (
+        ("upsert_stocks", bulk_upsert_stocks, stocks),
+        ("upsert_stock_info", bulk_upsert_stock_info, stock_info),
+        ("upsert_alerts", bulk_upsert_alerts, alerts),
+    )
+    timings = {}
+    with DBConnection() as connection:
+        with connection.cursor() as cursor:
+            # pg_temp is searched first, so the upserts hit these copies
+            for table in BENCH_TABLES:
+                cursor.execute(
+                    f"CREATE TEMP TABLE {table} (LIKE public.{table} INCLUDING ALL)"
+                )
+            connection.commit()
+
+            for method in UPSERT_METHODS:
+                for _ in range(repeat):
+                    # Insert into empty tables, then upsert the same rows again
+                    # (skipped unless the upsert rewrites unchanged rows)
+                    for phase in ("insert", "update"):
+                        for stage, upsert, values in upserts:
+                            started = time.perf_counter()
+                            upsert(connection, cursor, values, method=method)
+                            elapsed = time.perf_counter() - started
+                            stage = f"{stage}_{phase}[{method}]"
+                            timings.setdefault(stage, []).append(elapsed)
+                    for table in BENCH_TABLES:
+                        cursor.execute(f"TRUNCATE {table}")
+                    connection.commit()
+    return timings
+
+
+def bench(rows_list, scanner_classes, repeat, screened_only=False):
+    """
+    Time each stage at every size. Unless screened_only is set, the
+    per-scanner stages process the whole frame so that per-row costs show
+    up even when few synthetic stocks pass a scanner's filters.
+    """
+    results = []
+    for rows in rows_list:
+        csv = generate_finviz_csv(rows)
+        base = BaseScanner("")
+
+        timings, raw = timed(lambda: pd.read_csv(io.BytesIO(csv)).fillna(0), repeat)
+        record(results, rows, "read_csv", timings, items=len(raw))
+
+        timings, typed = timed(lambda: base.process_columns(raw.copy()), repeat)
+        record(results, rows, "process_columns", timings, items=len(typed))
+
+        timings, typed = timed(lambda: read_finviz_csv(csv), repeat)
+        record(results, rows, "read_finviz_csv", timings, items=len(typed))
+
+        timings, records = timed(lambda: build_records(typed), repeat)
+        record(results, rows, "build_records", timings, items=len(records))
+
+        if os.getenv("DB_HOST"):
+            for stage, stage_timings in bench_upserts(records, repeat).items():
+                record(results, rows, stage, stage_timings, items=len(records))
+
+        for scanner_class in scanner_classes:
+            scanner = scanner_class()
+            scanner.dry_run = True
+            name = scanner_class.__name__
+
+            columns = scanner.required_columns()
+            frame = raw[[col for col in raw.columns if col in columns]]
+            try:
+                timings, screened = timed(
+                    lambda: scanner.screen_universe(
+                        raw, typed, scanner.get_filter_params()
+                    ),
+                    repeat,
+                )
+            except UnsupportedFilterError:
+                pass
+            else:
+                record(results, rows, "screen", timings, name, len(screened))
+                if screened_only:
+                    frame = screened
+
+            timings, stocks = timed(lambda: scanner.process_data(frame.copy()), repeat)
+            record(results, rows, "process_data", timings, name, len(frame))
+
+            payloads, scanner.discord_sink = count_payloads()
+            timings, _ = timed(lambda: send_alerts(scanner, stocks), repeat)
+            messages = len(payloads) // repeat
+            record(results, rows, "create_discord_alert", timings, name, messages)
+
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scanner pipeline")
+    parser.add_argument("--rows", nargs="*", type=int, default=DEFAULT_ROWS)
+    parser.add_argument(
+        "--scanners", nargs="*", help="Bot directories or class names, default all"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--screened",
+        action="store_true",
+        help="Process only the rows passing each scanner's filters",
+    )
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = bench(
+        args.rows, load_scanner_classes(args.scanners), args.repeat, args.screened
+    )
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "results": results,
+    }
+
+    for result in results:
+        print(
+            f"{result['rows']:>6} {result['scanner'] or '-':<26} "
+            f"{result['stage']:<22} {result['seconds_min'] * 1000:>10.2f} ms"
+        )
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
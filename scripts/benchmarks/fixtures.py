@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+from common.columns import (
+    FLOAT_COLUMNS,
+    INT_COLUMNS,
+    PERCENTAGE_COLUMNS,
+    STRING_COLUMNS,
+)
+
+TOTAL_COLUMNS = 200
+
+SECTORS = [
+    "Technology",
+    "Healthcare",
+    "Financial",
+    "Consumer Cyclical",
+    "Industrials",
+    "Energy",
+    "Basic Materials",
+    "Utilities",
+]
+EXCHANGES = ["NASD", "NYSE", "AMEX"]
+COUNTRIES = ["USA", "China", "Canada", "Israel", "United Kingdom"]
+
+# Columns the export prints with a B/M/K suffix instead of plain millions
+SUFFIXED_COLUMNS = ["Income", "Sales", "Short Interest"]
+
+
+def _with_placeholders(values, rng, missing=0.03):
+    """Blank out a share of the cells the way Finviz does ("-" or empty)"""
+    values = np.asarray(values, dtype=object)
+    blanks = rng.random(len(values)) < missing
+    values[blanks] = rng.choice(["-", ""], blanks.sum())
+    return values
+
+
+def _percent(rng, rows, mean=5, spread=30):
+    return [f"{value:.2f}%" for value in rng.normal(mean, spread, rows)]
+
+
+def _suffixed(rng, rows):
+    amounts = rng.lognormal(5, 2.5, rows)
+    suffixes = np.where(amounts >= 1000, "B", np.where(amounts >= 1, "M", "K"))
+    scaled = np.where(
+        amounts >= 1000, amounts / 1000, np.where(amounts >= 1, amounts, amounts * 1000)
+    )
+    return [f"{value:.2f}{suffix}" for value, suffix in zip(scaled, suffixes)]
+
+
+def generate_finviz_frame(rows, seed=0):
+    """
+    Build a raw, 200 column DataFrame shaped like a Finviz export:
+    percentages as "12.34%", large numbers with commas or B/M/K suffixes,
+    and "-" or empty placeholders for missing values.
+    """
+    rng = np.random.default_rng(seed)
+    data = {}
+
+    for col in STRING_COLUMNS:
+        data[col] = [f"{col} {i}" for i in range(rows)]
+    data["Ticker"] = [f"T{i:05d}" for i in range(rows)]
+    data["Company"] = [f"Company {i} Inc" for i in range(rows)]
+    data["Sector"] = rng.choice(SECTORS, rows)
+    data["Industry"] = [f"Industry {i}" for i in rng.integers(0, 140, rows)]
+    data["Country"] = rng.choice(COUNTRIES, rows)
+    data["Exchange"] = rng.choice(EXCHANGES, rows)
+    data["Index"] = rng.choice(["-", "S&P 500", "DJIA, S&P 500"], rows)
+    data["Optionable"] = rng.choice(["Yes", "No"], rows)
+    data["Shortable"] = rng.choice(["Yes", "No"], rows, p=[0.9, 0.1])
+    offsets = pd.to_timedelta(rng.integers(-60, 60, rows), unit="D")
+    earnings = pd.Timestamp.now().normalize() - offsets
+    data["Earnings Date"] = earnings.strftime("%m/%d/%Y 04:30:00 PM")
+    data["IPO Date"] = pd.Timestamp("2000-01-03").strftime("%m/%d/%Y")
+
+    for col in PERCENTAGE_COLUMNS:
+        data[col] = _with_placeholders(_percent(rng, rows), rng)
+    data["Change"] = _percent(rng, rows, 0, 6)
+    data["Short Float"] = _with_placeholders(_percent(rng, rows, 12, 10), rng)
+    for col in ("50-Day High", "52-Week High"):
+        data[col] = [f"{-value:.2f}%" for value in rng.uniform(0, 60, rows)]
+    for col in ("50-Day Low", "52-Week Low"):
+        data[col] = [f"{value:.2f}%" for value in rng.uniform(0, 200, rows)]
+
+    for col in FLOAT_COLUMNS:
+        data[col] = _with_placeholders(np.round(rng.lognormal(2, 1, rows), 2), rng)
+    for col in SUFFIXED_COLUMNS:
+        data[col] = _with_placeholders(_suffixed(rng, rows), rng)
+    data["Market Cap"] = np.round(rng.lognormal(7, 2.2, rows), 2)
+    data["Average Volume"] = np.round(rng.lognormal(6, 1.8, rows), 2)
+    data["Price"] = np.round(rng.lognormal(3, 1.1, rows), 2)
+    data["Relative Volume"] = np.round(rng.lognormal(0, 0.6, rows), 2)
+    data["Relative Strength Index (14)"] = np.round(rng.uniform(10, 90, rows), 2)
+    data["Analyst Recom"] = np.round(rng.uniform(1, 5, rows), 2)
+
+    for col in INT_COLUMNS:
+        data[col] = rng.integers(1_000, 80_000_000, rows)
+    data["Employees"] = [f"{value:,}" for value in rng.integers(5, 300_000, rows)]
+
+    # Pad with the remaining custom columns the full export carries
+    for num in range(len(data) + 1, TOTAL_COLUMNS + 1):
+        data[f"Column {num}"] = np.round(rng.normal(0, 100, rows), 4)
+
+    return pd.DataFrame(data)
+
+
+def generate_finviz_csv(rows, seed=0):
+    """Return the CSV bytes of generate_finviz_frame(rows, seed)"""
+    return generate_finviz_frame(rows, seed).to_csv(index=False).encode()
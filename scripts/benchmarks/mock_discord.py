@@ -0,0 +1,103 @@
+"""
+Local stand-in for Discord webhooks, with Discord's per-webhook rate
+limit headers and 429 responses.
+
+    python -m benchmarks.mock_discord [--port 8787] [--limit 5] [--window 2]
+        [--output received.jsonl]
+
+Run the scanners against it with DISCORD_API_BASE=http://127.0.0.1:8787/api
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockWebhooks:
+    """Fixed-window rate limit of `limit` requests per `window` seconds per webhook"""
+
+    def __init__(self, limit=5, window=2.0, output=None):
+        self.limit = limit
+        self.window = window
+        self.output = output
+        self.buckets = {}
+        self.received = []
+        self.rate_limited = 0
+        self.lock = threading.Lock()
+
+    def handle(self, path, body):
+        """Returns (status, headers, body) for a POST to `path`"""
+        with self.lock:
+            now = time.monotonic()
+            used, window_start = self.buckets.get(path, (0, now))
+            if now - window_start >= self.window:
+                used, window_start = 0, now
+
+            reset_after = self.window - (now - window_start)
+            headers = {
+                "X-RateLimit-Limit": str(self.limit),
+                "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+            }
+            if used >= self.limit:
+                self.rate_limited += 1
+                headers["X-RateLimit-Remaining"] = "0"
+                headers["Retry-After"] = f"{reset_after:.3f}"
+                body = {"message": "Rate limited", "retry_after": reset_after}
+                return 429, headers, json.dumps(body).encode()
+
+            used += 1
+            self.buckets[path] = (used, window_start)
+            headers["X-RateLimit-Remaining"] = str(self.limit - used)
+            self.received.append({"path": path, "at": now, "payload": json.loads(body)})
+            if self.output:
+                with open(self.output, "a") as output:
+                    output.write(json.dumps(self.received[-1]) + "\n")
+            return 204, headers, b""
+
+
+def serve(webhooks, host="127.0.0.1", port=8787):
+    """Start the mock server on a daemon thread and return it"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            status, headers, response = webhooks.handle(self.path, body)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Discord webhook server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--window", type=float, default=2.0)
+    parser.add_argument("--output", help="Append received messages to this JSONL file")
+    args = parser.parse_args()
+
+    webhooks = MockWebhooks(args.limit, args.window, args.output)
+    server = serve(webhooks, args.host, args.port)
+    print(f"Mock Discord listening on http://{args.host}:{server.server_port}/api")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
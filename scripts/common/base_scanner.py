@@ -1,39 +1,199 @@
+import logging
 import os
-import time
 from datetime import datetime
-from random import uniform
 
 import pandas as pd
 import requests
+from common.columns import (
+    FINVIZ_COLUMN_IDS,
+    add_missing_columns,
+    convert_columns,
+    export_column_ids,
+    infer_stock_columns,
+    read_finviz_csv,
+)
+from common.discord import (
+    DISCORD_DELIVERY,
+    DISCORD_WEBHOOK_BASE_URL,
+    get_async_dispatcher,
+    pack_embeds,
+    post_webhook,
+)
 from common.extra_utils import (
+    UPSERT_METHOD,
+    bulk_insert_alert_events,
+    bulk_insert_stock_quotes,
     bulk_upsert_alerts,
     bulk_upsert_stock_info,
     bulk_upsert_stocks,
 )
-from common.utils import DBConnection, build_and_print_url, fetch_csv_as_dataframe
+from common.finviz_filters import UnsupportedFilterError, compile_filters
+from common.outbox import enqueue_messages
+from common.snapshot_diff import CHANGED, ENTERED, diff_snapshots
+from common.snapshot_store import (
+    archive_enabled,
+    archive_snapshot,
+    list_snapshots,
+    load_snapshot,
+)
+from common.suppression import AlertIndex
+from common.universe import (
+    FINVIZ_ALL_COLUMNS,
+    FINVIZ_EXPORT_URL,
+    get_typed_universe_snapshot,
+    universe_snapshot_shared,
+)
+from common.utils import (
+    DBConnection,
+    UnitOfWork,
+    build_and_print_url,
+    column_values,
+    fetch_csv_as_dataframe,
+    integer_values,
+)
 
 
 class BaseScanner:
+    # Export columns the scanner reads. Inferred from the stock["..."] and
+    # df["..."] lookups in the scanner's methods when left as None.
+    COLUMNS = None
+    # Skip tickers this scanner alerted on within COOLDOWN (a timedelta),
+    # unless one of the REALERT_ON metrics (common.suppression.Realert)
+    # moved far enough since. None disables suppression.
+    COOLDOWN = None
+    REALERT_ON = ()
+    # Only pass on stocks that entered the result set since the previous run,
+    # or whose columns in DIFF_COLUMNS changed by more than the mapped
+    # tolerance (None for any change). None alerts on the whole result set.
+    DIFF_COLUMNS = None
+
     def __init__(self, discord_webhook):
-        self.BASE_URL = "https://discord.com/api/webhooks/"
+        self.BASE_URL = DISCORD_WEBHOOK_BASE_URL
         self.NEXT_URL = discord_webhook
         self.DISCORD_WEBHOOK = self.BASE_URL + self.NEXT_URL
         self.FINVIZ_EMAIL = os.getenv("FINVIZ_EMAIL")
         self.DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+        # Replays send payloads to a local callable and skip database writes
+        self.discord_sink = None
+        self.dry_run = False
+        # Embeds waiting for flush_discord_messages
+        self.pending_embeds = []
+        # "sync", "async" or "outbox", see common.discord.DISCORD_DELIVERY
+        self.delivery = DISCORD_DELIVERY
+        # Recent alerts of this scanner, loaded by suppress_recent_alerts
+        self.alert_index = None
+        # Writes of the persist stage held back until the alerts are rendered, so
+        # that they are committed together with the outbox messages
+        self.pending_db_operations = None
+        # Whether run_scanner waits for async deliveries to finish. A caller
+        # running several scanners can drain the dispatcher once instead.
+        self.wait_for_delivery = True
+        # Opens the database connection of a read or write, the orchestrator
+        # replaces it with a SharedDBConnection
+        self.db_connection = DBConnection
+        # "values" or "copy", see common.extra_utils.UPSERT_METHOD
+        self.upsert_method = UPSERT_METHOD
+        # Screen the shared universe snapshot instead of downloading a filtered
+        # export. Only pays off when the download is shared: through
+        # UNIVERSE_SNAPSHOT_DIR, or with the scanners in one process.
+        self.use_universe = universe_snapshot_shared()
+        # Processed result set of the previous run, compared by select_changes
+        self.previous_result = None
+        # select_changes passes frames through while False
+        self.diff_enabled = True
+
+    def required_columns(self):
+        """Export columns needed to process, persist and alert on the scanner's stocks"""
+        # Exchange is stored with every stock but is never read by name in
+        # the scanners, so inference does not pick it up. It has no known
+        # export id either: projected exports leave it "N/A" and the stocks
+        # upsert keeps the stored exchange.
+        columns = {"Ticker", "Volume", "Average Volume", "Exchange"}
+        columns |= {rule.column for rule in self.REALERT_ON}
+        columns |= set(self.DIFF_COLUMNS or ())
+        if self.COLUMNS is not None:
+            return sorted(columns | set(self.COLUMNS))
+
+        methods = [
+            self.transform,
+            self.select,
+            self.prepare_base_records,
+            self.prepare_quote_records,
+            self.get_alert_data,
+            self.get_processed_stock,
+            self.create_discord_alert,
+        ]
+        return sorted(columns | infer_stock_columns(*methods))
 
     def download_finviz_data(self, filter_params):
-        """Download data from Finviz with given filter parameters"""
-        url = "https://elite.finviz.com/export.ashx"
+        """Select the stocks matching filter_params from the shared universe
+        snapshot, or download them as a filtered export"""
+        if not self.use_universe:
+            return self.download_finviz_export(filter_params, self.required_columns())
+
+        universe, typed_universe = get_typed_universe_snapshot(
+            self.FINVIZ_EMAIL, self.process_columns
+        )
+        if universe is None:
+            return self.download_finviz_export(filter_params, self.required_columns())
+
+        try:
+            return self.screen_universe(universe, typed_universe, filter_params)
+        except UnsupportedFilterError as e:
+            # Let Finviz evaluate filters we cannot reproduce locally
+            print(f"Screening on Finviz: {e}")
+            tickers = self.download_finviz_tickers(filter_params)
+            return self.project_universe(universe, universe["Ticker"].isin(tickers))
+
+    def screen_universe(self, universe, typed_universe, filter_params):
+        """Apply filter_params locally, raises UnsupportedFilterError"""
+        mask = compile_filters(filter_params)(typed_universe)
+        return self.project_universe(universe, mask)
+
+    def project_universe(self, universe, mask):
+        """Keep the masked rows and the columns this scanner needs"""
+        columns = self.required_columns()
+        columns = [col for col in universe.columns if col in columns]
+        df = universe.loc[mask, columns].reset_index(drop=True)
+        print(f"Selected {len(df)} stocks from the universe snapshot")
+        return df
+
+    def download_finviz_tickers(self, filter_params):
+        """Download only the tickers matching filter_params"""
+        df = self.download_finviz_export(filter_params, ["Ticker"])
+        if df.empty:
+            return []
+        return df["Ticker"].tolist()
+
+    def download_finviz_export(self, filter_params, columns=None):
+        """Download data from Finviz with given filter parameters.
+        Only the given columns with a known id are requested and parsed, the
+        others are added as missing values."""
+        column_ids = export_column_ids(columns) if columns else None
+        requested = [col for col in columns or () if col in FINVIZ_COLUMN_IDS]
         params = {
             "v": "152",
             "f": filter_params,
             "ft": "4",
-            "c": ",".join([str(num) for num in range(1, 201)]),
+            "c": column_ids or FINVIZ_ALL_COLUMNS,
             "auth": f"{self.FINVIZ_EMAIL}",
         }
-        df = fetch_csv_as_dataframe(url, params)
-        build_and_print_url(url, params)
+        df = fetch_csv_as_dataframe(
+            FINVIZ_EXPORT_URL, params, usecols=columns, parser=read_finviz_csv
+        )
+
+        if column_ids and not df.empty and not set(requested) <= set(df.columns):
+            # A column id did not resolve to the expected header, fetch them all
+            params["c"] = FINVIZ_ALL_COLUMNS
+            df = fetch_csv_as_dataframe(
+                FINVIZ_EXPORT_URL, params, usecols=columns, parser=read_finviz_csv
+            )
+
+        build_and_print_url(FINVIZ_EXPORT_URL, params)
         print(f"Downloaded {len(df)} stocks from Finviz")
+        if columns and not df.empty:
+            # Columns without a known id were not requested
+            df = add_missing_columns(df, columns)
         return df
 
     def process_columns_bak(self, df):
@@ -73,222 +233,234 @@ class BaseScanner:
 
     def process_columns(self, df):
         """Process DataFrame columns with appropriate type conversions"""
+        return convert_columns(df)
+
+    def prepare_base_records(self, df):
+        """Build the stock and stock info upsert tuples of every row at once.
+        Missing values become None so they are stored as NULL."""
+        now = ["NOW()"] * len(df)
+        values = column_values
+
+        stocks_to_upsert = list(
+            zip(
+                values(df["Ticker"]),
+                values(df["Company"]),
+                values(df["Exchange"]),
+                values(df["Sector"]),
+                values(df["Industry"]),
+                now,
+                now,
+            )
+        )
+        stocks_info_to_upsert = list(
+            zip(
+                values(df["Ticker"]),
+                values(df["Market Cap"]),
+                integer_values(df["Average Volume"]),
+                values(df["Price"]),
+                integer_values(df["Volume"]),
+                now,
+            )
+        )
+        return stocks_to_upsert, stocks_info_to_upsert
 
-        percentage_cols = [
-            "Dividend Yield",
-            "Payout Ratio",
-            "EPS growth this year",
-            "EPS growth next year",
-            "EPS growth past 5 years",
-            "EPS growth next 5 years",
-            "Sales growth past 5 years",
-            "EPS growth quarter over quarter",
-            "Sales growth quarter over quarter",
-            "Insider Ownership",
-            "Insider Transactions",
-            "Institutional Ownership",
-            "Institutional Transactions",
-            "Short Float",
-            "Return on Assets",
-            "Return on Equity",
-            "Return on Investment",
-            "Gross Margin",
-            "Operating Margin",
-            "Profit Margin",
-            "Performance (Week)",
-            "Performance (Month)",
-            "Performance (Quarter)",
-            "Performance (Half Year)",
-            "Performance (Year)",
-            "Performance (YTD)",
-            "Volatility (Week)",
-            "Volatility (Month)",
-            "20-Day Simple Moving Average",
-            "50-Day Simple Moving Average",
-            "200-Day Simple Moving Average",
-            "Change from Open",
-            "Gap",
-            "Change",
-            "After-Hours Change",
-            "Float %",
-            "EPS Surprise",
-            "Revenue Surprise",
-            "50-Day High",
-        ]
-
-        float_cols = [
-            "Market Cap",
-            "P/E",
-            "Forward P/E",
-            "PEG",
-            "P/S",
-            "P/B",
-            "P/Cash",
-            "P/Free Cash Flow",
-            "EPS (ttm)",
-            "Shares Outstanding",
-            "Shares Float",
-            "Short Ratio",
-            "Current Ratio",
-            "Quick Ratio",
-            "LT Debt/Equity",
-            "Total Debt/Equity",
-            "Beta",
-            "Average True Range",
-            "Relative Strength Index (14)",
-            "Analyst Recom",
-            "Average Volume",
-            "Relative Volume",
-            "Price",
-            "Target Price",
-            "Book/sh",
-            "Cash/sh",
-            "Dividend",
-            "Employees",
-            "EPS next Q",
-            "Income",
-            "Prev Close",
-            "Sales",
-            "Short Interest",
-            "Open",
-            "High",
-            "Low",
-        ]
-
-        int_cols = ["Volume", "Trades"]
-
-        string_cols = [
-            "Ticker",
-            "Company",
-            "Sector",
-            "Industry",
-            "Country",
-            "Earnings Date",
-            "IPO Date",
-            "Index",
-            "Optionable",
-            "Shortable",
-            "Exchange",
-        ]
+    def prepare_quote_records(self, df):
+        """Build the quote time series tuples of every row at once"""
+        values = column_values
+        return list(
+            zip(
+                values(df["Ticker"]),
+                ["NOW()"] * len(df),
+                values(df["Price"]),
+                values(df["Change"]),
+                integer_values(df["Volume"]),
+                values(df["Relative Volume"]),
+                values(df["Market Cap"]),
+            )
+        )
 
-        # Process percentage columns
-        for col in percentage_cols:
-            if col in df.columns:
-                try:
-                    df[col] = (
-                        pd.to_numeric(
-                            df[col].str.replace("%", "").str.replace(",", ""),
-                            errors="coerce",
-                        )
-                        / 100
-                    )
-                except Exception:
-                    df[col] = pd.Series([0] * len(df), dtype="float64")
+    def load_alert_index(self):
+        """Read this scanner's alerts within the cooldown from alerts_alert"""
+        data_keys = [rule.data_key for rule in self.REALERT_ON]
+        if self.dry_run:
+            return AlertIndex.empty(data_keys)
+        with self.db_connection() as connection:
+            with connection.cursor() as cursor:
+                return AlertIndex.load(
+                    cursor, self.get_alert_type(), self.COOLDOWN, data_keys
+                )
 
-        # Process float columns
-        for col in float_cols:
-            if col in df.columns:
-                try:
-                    if df[col].dtype == object:
-                        df[col] = df[col].apply(
-                            lambda x: (
-                                float(
-                                    str(x)
-                                    .replace("B", "e9")
-                                    .replace("M", "e6")
-                                    .replace(",", "")
-                                )
-                                if pd.notna(x) and isinstance(x, str)
-                                else x
-                            )
-                        )
-                    df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
-                except Exception:
-                    df[col] = pd.Series([0] * len(df), dtype="float64")
+    def suppress_recent_alerts(self, df):
+        """Drop the stocks still in their alert cooldown, see COOLDOWN"""
+        if self.COOLDOWN is None or df.empty:
+            return df
+        if self.alert_index is None:
+            self.alert_index = self.load_alert_index()
+
+        suppressed = self.alert_index.suppressed(df, self.COOLDOWN, self.REALERT_ON)
+        if suppressed.any():
+            print(f"Suppressed {suppressed.sum()} stocks alerted within the cooldown")
+        return df[~suppressed]
+
+    def load_previous_result(self):
+        """Read the result set of this scanner's latest archived run, if any.
+        The archive holds the run's export, so it goes through transform and
+        select like the current stocks do."""
+        if self.dry_run or not archive_enabled():
+            return None
+        snapshots = list_snapshots(scanner=type(self).__name__)
+        if snapshots.empty:
+            return None
+        try:
+            previous = self.transform(load_snapshot(snapshots.path.iloc[-1]))
+        except (OSError, ValueError) as e:
+            print(f"Could not load the previous result set: {e}")
+            return None
+
+        self.diff_enabled = False
+        try:
+            return self.select(previous)
+        finally:
+            self.diff_enabled = True
+
+    def select_changes(self, df):
+        """Keep the stocks that entered or changed since the previous run"""
+        if self.DIFF_COLUMNS is None or not self.diff_enabled:
+            return df
+
+        if self.previous_result is None:
+            # Every stock would count as entered, say why rather than pretend
+            logging.warning(
+                f"{type(self).__name__} has no previous result set to diff "
+                "against (is SNAPSHOT_ARCHIVE_DIR set?), passing all stocks on"
+            )
+            self.previous_result = df
+            return df
+
+        diff = diff_snapshots(df, self.previous_result, self.DIFF_COLUMNS)
+        self.previous_result = df
+        counts = diff.counts()
+        print(
+            f"{counts['entered']} stocks entered, {counts['changed']} changed, "
+            f"{counts['unchanged']} unchanged and {counts['exited']} exited "
+            "since the previous run"
+        )
+        return df[diff.mask(ENTERED, CHANGED)].reset_index(drop=True)
 
-        # Process integer columns
-        for col in int_cols:
-            if col in df.columns:
-                try:
-                    df[col] = pd.to_numeric(
-                        df[col].str.replace(",", ""), errors="coerce"
-                    ).astype("Int64")
-                except Exception:
-                    df[col] = pd.Series([0] * len(df), dtype="Int64")
+    def get_processed_stocks(self, df):
+        """Convert every row of df to a processed stock dict in one pass"""
+        return [self.get_processed_stock(stock) for stock in df.to_dict("records")]
 
-        # Fill string columns
-        for col in string_cols:
-            if col in df.columns:
-                df[col] = df[col].fillna("N/A").astype("string")
+    def ingest(self, snapshot=None):
+        """Ingest stage: the scanner's stocks from Finviz, or a stored snapshot"""
+        if snapshot is None:
+            df = self.download_finviz_data(self.get_filter_params())
+        else:
+            df = snapshot.copy()
+        if df is None or df.empty:
+            return None
 
+        if self.DIFF_COLUMNS is not None and self.previous_result is None:
+            # Read before this run's own snapshot is archived
+            self.previous_result = self.load_previous_result()
+        if archive_enabled() and snapshot is None:
+            archive_snapshot(self.process_columns(df.copy()), type(self).__name__)
         return df
 
-    def prepare_base_data(self, stock):
-        """Prepare common stock data for database operations"""
-        stocks_to_upsert = (
-            stock["Ticker"],
-            stock["Company"],
-            stock["Exchange"],
-            stock["Sector"],
-            stock["Industry"],
-            "NOW()",
-            "NOW()",
-        )
-
-        stocks_info_to_upsert = (
-            stock["Ticker"],
-            stock["Market Cap"],
-            stock["Average Volume"],
-            stock["Price"],
-            stock["Volume"],
-            "NOW()",
-        )
-
-        return stocks_to_upsert, stocks_info_to_upsert
-
-    def process_data(self, df):
-        """Template method for data processing
-        Override get_alert_data and get_processed_stock in child classes"""
-        df = self.process_columns(df)
-
-        stocks_to_upsert = []
-        stocks_info_to_upsert = []
-        alerts_to_upsert = []
-        processed_stocks = []
-
-        for _, stock in df.iterrows():
-            base_stock, base_info = self.prepare_base_data(stock)
-            stocks_to_upsert.append(base_stock)
-            stocks_info_to_upsert.append(base_info)
-
-            alert_data = self.get_alert_data(stock)
-            alerts_to_upsert.append(
-                (
-                    stock["Ticker"],
-                    self.get_alert_type(),
-                    "NOW()",
-                    alert_data,
-                    "NOW()",
-                    "NOW()",
-                )
+    def transform(self, df):
+        """Transform stage: typed columns. Override to derive more columns,
+        starting from super().transform(df)"""
+        return self.process_columns(df)
+
+    def select(self, df):
+        """Select stage: the stocks this run persists and alerts on. Override
+        to filter further, ending with super().select(df)"""
+        return self.select_changes(df)
+
+    def persist(self, df):
+        """Persist stage: write the selected stocks, their quotes and the
+        alerts of the stocks outside their cooldown in one batch.
+        Returns:
+            list: The processed stocks to notify about.
+        """
+        stocks_to_upsert, stocks_info_to_upsert = self.prepare_base_records(df)
+        quotes_to_insert = self.prepare_quote_records(df)
+        df = self.suppress_recent_alerts(df)
+        processed_stocks = self.get_processed_stocks(df)
+
+        alert_type = self.get_alert_type()
+        alerts_to_upsert = [
+            (
+                stock["Ticker"],
+                alert_type,
+                "NOW()",
+                self.get_alert_data(stock),
+                "NOW()",
+                "NOW()",
             )
+            for stock in processed_stocks
+        ]
 
-            processed_stock = self.get_processed_stock(stock)
-            processed_stocks.append(processed_stock)
-
-        self.bulk_db_operations(
-            stocks_to_upsert, stocks_info_to_upsert, alerts_to_upsert
-        )
+        if self.delivery == "outbox":
+            # Committed together with the rendered alerts when they are flushed
+            self.pending_db_operations = (
+                stocks_to_upsert,
+                stocks_info_to_upsert,
+                alerts_to_upsert,
+                quotes_to_insert,
+            )
+        else:
+            self.bulk_db_operations(
+                stocks_to_upsert,
+                stocks_info_to_upsert,
+                alerts_to_upsert,
+                quotes_to_insert,
+            )
 
         return processed_stocks
 
-    def bulk_db_operations(self, stocks, stock_info, alerts):
-        """Execute bulk database operations"""
-        with DBConnection() as connection:
-            with connection.cursor() as cursor:
-                bulk_upsert_stocks(connection, cursor, stocks)
-                bulk_upsert_stock_info(connection, cursor, stock_info)
-                bulk_upsert_alerts(connection, cursor, alerts)
+    def notify(self, stocks):
+        """Notify stage: render the alerts and send them"""
+        self.create_discord_alert(stocks)
+        self.flush_discord_messages()
+
+    def process_data(self, df):
+        """Template method: transform, select and persist the stocks
+        Override transform, select, get_alert_data and get_processed_stock
+        in child classes"""
+        return self.persist(self.select(self.transform(df)))
+
+    def bulk_db_operations(self, stocks, stock_info, alerts, quotes=(), messages=()):
+        """Execute bulk database operations in a single transaction.
+        messages are (webhook_url, payload) pairs for the Discord outbox.
+        Only the alerts and the outbox messages are critical, the stock
+        refreshes, alert history and quotes never hold them back. Rows that
+        reference a stock whose upsert was skipped fail their own step."""
+        if self.dry_run:
+            return
+        work = UnitOfWork(connect=self.db_connection)
+        method = self.upsert_method
+        if stocks:
+            work.add(bulk_upsert_stocks, stocks, method=method, critical=False)
+        if stock_info:
+            work.add(bulk_upsert_stock_info, stock_info, method=method, critical=False)
+        if alerts:
+            work.add(bulk_upsert_alerts, alerts, method=method)
+            # History of every trigger, alerts_alert only keeps the latest
+            events = [alert[:4] + ("NOW()",) for alert in alerts]
+            work.add(bulk_insert_alert_events, events, method=method, critical=False)
+        if quotes:
+            work.add(bulk_insert_stock_quotes, quotes, critical=False)
+        if messages:
+            work.add(enqueue_messages, type(self).__name__, messages)
+        work.commit()
+
+        for step, counts in work.results:
+            if isinstance(counts, dict):
+                print(
+                    f"{step}: {counts['inserted']} inserted, "
+                    f"{counts['changed']} changed, {counts['skipped']} unchanged"
+                )
 
     def create_discord_alert(self, stocks):
         """Override this method in child classes"""
@@ -299,34 +471,61 @@ class BaseScanner:
         raise NotImplementedError
 
     def get_processed_stock(self, stock):
-        return stock.to_dict()
+        return dict(stock)
 
     def get_alert_type(self):
         """Override this method in child classes"""
         raise NotImplementedError
 
     def send_discord_message(self, embed):
-        """Common method to send Discord messages"""
-        headers = {"Content-Type": "application/json"}
-        payload = {"embeds": [embed]}
-
-        response = requests.post(self.DISCORD_WEBHOOK, json=payload, headers=headers)
-
-        if response.status_code != 204:
-            print(f"Failed to send alert: {response.text}")
-
-        time.sleep(uniform(0.5, 1.0))
-
-    def run_scanner(self):
-        """Main method to run the scanner"""
-        df = self.download_finviz_data(self.get_filter_params())
-        if df is None or df.empty:
+        """Queue an embed, flush_discord_messages sends the queue"""
+        self.pending_embeds.append(embed)
+
+    def flush_discord_messages(self):
+        """Send the queued embeds packed into as few webhook messages as possible"""
+        embeds, self.pending_embeds = self.pending_embeds, []
+        outbox = []
+        for batch in pack_embeds(embeds):
+            payload = {"embeds": batch}
+
+            if self.discord_sink is not None:
+                self.discord_sink(self, payload)
+            elif self.delivery == "outbox":
+                outbox.append((self.DISCORD_WEBHOOK, payload))
+            elif self.delivery == "async":
+                get_async_dispatcher().submit(self.DISCORD_WEBHOOK, payload)
+            else:
+                try:
+                    post_webhook(self.DISCORD_WEBHOOK, payload)
+                except requests.exceptions.RequestException as e:
+                    # The other messages still go out
+                    logging.error(f"Could not deliver Discord message: {e}")
+
+        if self.delivery == "outbox":
+            # The outbox worker delivers the messages once they are committed
+            pending, self.pending_db_operations = self.pending_db_operations, None
+            if outbox or pending:
+                self.bulk_db_operations(*(pending or ([], [], [], [])), messages=outbox)
+
+        async_delivery = self.delivery == "async" and self.discord_sink is None
+        if async_delivery and self.wait_for_delivery and embeds:
+            get_async_dispatcher().drain()
+
+    def run_scanner(self, snapshot=None):
+        """Main method to run the scanner
+        Pass a DataFrame as snapshot to run on stored data instead of Finviz"""
+        # Recent alerts are read once per run
+        self.alert_index = None
+        df = self.ingest(snapshot)
+        if df is None:
             print("No data retrieved from Finviz")
             return
 
         stocks = self.process_data(df)
         if stocks:
-            self.create_discord_alert(stocks)
+            self.notify(stocks)
             print(f"Successfully processed {len(stocks)} stocks")
         else:
+            # Commits the writes the outbox delivery holds back for the alerts
+            self.flush_discord_messages()
             print("No stocks matched the criteria")
@@ -0,0 +1,91 @@
+import numpy as np
+
+MILLION = 1e6
+BILLION = 1e9
+
+# Finviz exports Market Cap in millions of USD
+MARKET_CAP_UNIT = MILLION
+
+# Label -> [low, high) market cap in USD. Ranges must be contiguous.
+MARKET_CAP_BUCKETS = {
+    "Small Cap": (0, 2 * BILLION),
+    "Mid Cap": (2 * BILLION, 10 * BILLION),
+    "Large Cap": (10 * BILLION, float("inf")),
+}
+
+
+def bucket_edges(buckets):
+    """
+    Split {label: (low, high)} ranges into labels and sorted bin edges.
+    Raises:
+        ValueError: When the ranges are unsorted, overlap or leave gaps.
+    """
+    labels = list(buckets)
+    ranges = list(buckets.values())
+    for (_, high), (low, _) in zip(ranges, ranges[1:]):
+        if high != low:
+            raise ValueError(f"Bucket ranges must be contiguous: {buckets}")
+    if any(low >= high for low, high in ranges):
+        raise ValueError(f"Bucket ranges must be increasing: {buckets}")
+    edges = np.array([ranges[0][0]] + [high for _, high in ranges], dtype="float64")
+    return labels, edges
+
+
+def assign_buckets(values, buckets, unit=1.0):
+    """
+    Find the bucket of every value with one searchsorted call.
+    Parameters:
+        values: Numbers in `unit`s (e.g. millions of USD for Finviz Market Cap).
+        buckets (dict): {label: (low, high)} in the base unit.
+        unit (float): What one of `values` is worth in the base unit.
+    Returns:
+        np.ndarray: The bucket index of each value, -1 outside every bucket.
+    """
+    labels, edges = bucket_edges(buckets)
+    scaled = np.asarray(values, dtype="float64") * unit
+    positions = np.searchsorted(edges, scaled, side="right") - 1
+    outside = np.isnan(scaled) | (positions < 0) | (positions >= len(labels))
+    positions[outside] = -1
+    return positions
+
+
+def group_by_bucket(df, column, buckets, unit=1.0):
+    """
+    Split df into one frame per bucket of `column` with a single groupby
+    over the assign_buckets positions, keeping row order within each frame.
+    Rows outside every bucket are dropped.
+    Returns:
+        dict: {label: pd.DataFrame} for every label, empty frames included.
+    """
+    values = df[column].to_numpy(dtype="float64", na_value=np.nan)
+    positions = assign_buckets(values, buckets, unit)
+    frames = dict(iter(df.groupby(positions, sort=False)))
+    return {
+        label: frames.get(index, df.iloc[0:0]) for index, label in enumerate(buckets)
+    }
+
+
+def group_by_market_cap(df, buckets=None):
+    """Split a Finviz frame by Market Cap, see MARKET_CAP_BUCKETS"""
+    return group_by_bucket(
+        df, "Market Cap", buckets or MARKET_CAP_BUCKETS, unit=MARKET_CAP_UNIT
+    )
+
+
+def label_by_market_cap(df, buckets=None):
+    """
+    The market cap bucket label of every row of a Finviz frame.
+    Returns:
+        np.ndarray: Labels, None outside every bucket.
+    """
+    buckets = buckets or MARKET_CAP_BUCKETS
+    values = df["Market Cap"].to_numpy(dtype="float64", na_value=np.nan)
+    positions = assign_buckets(values, buckets, unit=MARKET_CAP_UNIT)
+    labels = np.array(list(buckets) + [None], dtype=object)
+    # -1 picks the trailing None
+    return labels[positions]
+
+
+def market_cap_billions(market_cap):
+    """Convert an exported Market Cap to billions of USD"""
+    return market_cap * MARKET_CAP_UNIT / BILLION
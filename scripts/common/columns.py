@@ -0,0 +1,451 @@
+import csv
+import inspect
+import re
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+except ImportError:  # Falls back to the slower pandas string methods
+    pa = None
+    pc = None
+    pa_csv = None
+
+PERCENTAGE_COLUMNS = [
+    "Dividend Yield",
+    "Payout Ratio",
+    "EPS growth this year",
+    "EPS growth next year",
+    "EPS growth past 5 years",
+    "EPS growth next 5 years",
+    "Sales growth past 5 years",
+    "EPS growth quarter over quarter",
+    "Sales growth quarter over quarter",
+    "Insider Ownership",
+    "Insider Transactions",
+    "Institutional Ownership",
+    "Institutional Transactions",
+    "Short Float",
+    "Return on Assets",
+    "Return on Equity",
+    "Return on Investment",
+    "Gross Margin",
+    "Operating Margin",
+    "Profit Margin",
+    "Performance (Week)",
+    "Performance (Month)",
+    "Performance (Quarter)",
+    "Performance (Half Year)",
+    "Performance (Year)",
+    "Performance (YTD)",
+    "Volatility (Week)",
+    "Volatility (Month)",
+    "20-Day Simple Moving Average",
+    "50-Day Simple Moving Average",
+    "200-Day Simple Moving Average",
+    "Change from Open",
+    "Gap",
+    "Change",
+    "After-Hours Change",
+    "Float %",
+    "EPS Surprise",
+    "Revenue Surprise",
+    "50-Day High",
+    "50-Day Low",
+    "52-Week High",
+    "52-Week Low",
+]
+
+FLOAT_COLUMNS = [
+    "Market Cap",
+    "P/E",
+    "Forward P/E",
+    "PEG",
+    "P/S",
+    "P/B",
+    "P/Cash",
+    "P/Free Cash Flow",
+    "EPS (ttm)",
+    "Shares Outstanding",
+    "Shares Float",
+    "Short Ratio",
+    "Current Ratio",
+    "Quick Ratio",
+    "LT Debt/Equity",
+    "Total Debt/Equity",
+    "Beta",
+    "Average True Range",
+    "Relative Strength Index (14)",
+    "Analyst Recom",
+    "Average Volume",
+    "Relative Volume",
+    "Price",
+    "Target Price",
+    "Book/sh",
+    "Cash/sh",
+    "Dividend",
+    "Employees",
+    "EPS next Q",
+    "Income",
+    "Prev Close",
+    "Sales",
+    "Short Interest",
+    "Open",
+    "High",
+    "Low",
+]
+
+INT_COLUMNS = ["Volume", "Trades"]
+
+STRING_COLUMNS = [
+    "Ticker",
+    "Company",
+    "Earnings Date",
+    "IPO Date",
+    "Index",
+    "Optionable",
+    "Shortable",
+]
+
+# Low-cardinality text, stored as pandas categoricals
+CATEGORY_COLUMNS = ["Sector", "Industry", "Country", "Exchange"]
+
+# Column -> type, drives convert_columns
+COLUMN_TYPES = {
+    **{col: "percent" for col in PERCENTAGE_COLUMNS},
+    **{col: "float" for col in FLOAT_COLUMNS},
+    **{col: "int" for col in INT_COLUMNS},
+    **{col: "string" for col in STRING_COLUMNS},
+    **{col: "category" for col in CATEGORY_COLUMNS},
+}
+NUMERIC_KINDS = ("percent", "float", "int")
+
+UNIT_MULTIPLIERS = {"K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+NUMBER_PATTERN = r"^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$"
+MISSING = pa.array(["-", "", "nan", "None"]) if pa is not None else None
+# Text columns are kept in Arrow memory instead of as Python objects
+STRING_DTYPE = pd.StringDtype("pyarrow") if pa is not None else "string"
+
+# Finviz custom-view column ids ("c" export parameter) by export header name
+FINVIZ_COLUMN_IDS = {
+    "Ticker": 1,
+    "Company": 2,
+    "Sector": 3,
+    "Industry": 4,
+    "Country": 5,
+    "Market Cap": 6,
+    "P/E": 7,
+    "Forward P/E": 8,
+    "PEG": 9,
+    "P/S": 10,
+    "P/B": 11,
+    "P/Cash": 12,
+    "P/Free Cash Flow": 13,
+    "Dividend Yield": 14,
+    "Payout Ratio": 15,
+    "EPS (ttm)": 16,
+    "EPS growth this year": 17,
+    "EPS growth next year": 18,
+    "EPS growth past 5 years": 19,
+    "EPS growth next 5 years": 20,
+    "Sales growth past 5 years": 21,
+    "EPS growth quarter over quarter": 22,
+    "Sales growth quarter over quarter": 23,
+    "Shares Outstanding": 24,
+    "Shares Float": 25,
+    "Insider Ownership": 26,
+    "Insider Transactions": 27,
+    "Institutional Ownership": 28,
+    "Institutional Transactions": 29,
+    "Short Float": 30,
+    "Short Ratio": 31,
+    "Return on Assets": 32,
+    "Return on Equity": 33,
+    "Return on Investment": 34,
+    "Current Ratio": 35,
+    "Quick Ratio": 36,
+    "LT Debt/Equity": 37,
+    "Total Debt/Equity": 38,
+    "Gross Margin": 39,
+    "Operating Margin": 40,
+    "Profit Margin": 41,
+    "Performance (Week)": 42,
+    "Performance (Month)": 43,
+    "Performance (Quarter)": 44,
+    "Performance (Half Year)": 45,
+    "Performance (Year)": 46,
+    "Performance (YTD)": 47,
+    "Beta": 48,
+    "Average True Range": 49,
+    "Volatility (Week)": 50,
+    "Volatility (Month)": 51,
+    "20-Day Simple Moving Average": 52,
+    "50-Day Simple Moving Average": 53,
+    "200-Day Simple Moving Average": 54,
+    "50-Day High": 55,
+    "50-Day Low": 56,
+    "52-Week High": 57,
+    "52-Week Low": 58,
+    "Relative Strength Index (14)": 59,
+    "Change from Open": 60,
+    "Gap": 61,
+    "Analyst Recom": 62,
+    "Average Volume": 63,
+    "Relative Volume": 64,
+    "Price": 65,
+    "Change": 66,
+    "Volume": 67,
+    "Earnings Date": 68,
+    "Target Price": 69,
+    "IPO Date": 70,
+}
+
+EXPORT_COLUMNS = set(
+    PERCENTAGE_COLUMNS + FLOAT_COLUMNS + INT_COLUMNS + STRING_COLUMNS
+) | set(FINVIZ_COLUMN_IDS)
+
+STOCK_FIELD_PATTERN = re.compile(r"""\b(?:stock|df)\[\s*(["'])(.+?)\1\s*\]""")
+
+
+def infer_stock_columns(*functions):
+    """
+    Collect the export columns read as stock["..."] or df["..."] in the
+    given functions.
+    Names that are not Finviz export columns (values the scanner derives
+    itself) are ignored.
+    """
+    columns = set()
+    for function in functions:
+        try:
+            source = inspect.getsource(function)
+        except (OSError, TypeError):
+            continue
+        columns.update(match.group(2) for match in STOCK_FIELD_PATTERN.finditer(source))
+    return columns & EXPORT_COLUMNS
+
+
+def export_column_ids(columns):
+    """
+    Return the "c" export parameter of the given columns that have a known
+    id, or None when none of them has one. The others are left to
+    add_missing_columns.
+    """
+    ids = {FINVIZ_COLUMN_IDS[column] for column in columns if column in FINVIZ_COLUMN_IDS}
+    return ",".join(str(num) for num in sorted(ids)) or None
+
+
+def add_missing_columns(df, columns, column_types=None):
+    """
+    Add the given columns that df lacks, e.g. because they have no known
+    export id, as missing values: NaN or <NA> for numbers, "N/A" for text.
+    """
+    column_types = column_types or COLUMN_TYPES
+    missing = [col for col in columns if col not in df.columns]
+    if not missing:
+        return df
+
+    added = {}
+    for col in missing:
+        kind = column_types.get(col)
+        if kind == "int":
+            added[col] = pd.array([pd.NA] * len(df), dtype="Int64")
+        elif kind in NUMERIC_KINDS:
+            added[col] = np.full(len(df), np.nan)
+        else:
+            added[col] = _final_text(pd.Series(["N/A"] * len(df), index=df.index), kind)
+    return df.assign(**added)
+
+
+def _to_numpy(array):
+    if isinstance(array, pa.ChunkedArray):
+        return array.to_numpy()
+    return array.to_numpy(zero_copy_only=False)
+
+
+def parse_numbers(values, empty=np.nan):
+    """
+    Vectorized parse of Finviz number strings such as "1,234", "12.5%",
+    "3.2B" or "-". Thousands separators and percent signs are dropped,
+    K/M/B/T suffixes are expanded, surrounding whitespace is ignored and
+    anything unparsable or not finite ("inf") becomes NaN.
+    Parameters:
+        values: Python values, or an Arrow string (chunked) array which is
+            parsed without a round trip through Python objects.
+        empty: The value of empty and null cells.
+    Returns:
+        np.ndarray: float64 values (percentages are not divided by 100).
+    """
+    if pa is None:
+        return _parse_numbers_pandas(values, empty)
+
+    if isinstance(values, (pa.Array, pa.ChunkedArray)):
+        text = pc.fill_null(values, "")
+    else:
+        text = pa.array(
+            ["" if pd.isna(value) else str(value) for value in values], type=pa.string()
+        )
+    text = pc.utf8_trim_whitespace(text)
+    blank = _to_numpy(pc.equal(text, ""))
+    text = pc.replace_substring(pc.replace_substring(text, "%", ""), ",", "")
+
+    multipliers = np.ones(len(text))
+    suffixed = pc.match_substring_regex(text, "[KMBT]$")
+    if pc.any(suffixed).as_py():
+        suffix = pc.utf8_slice_codeunits(text, -1)
+        for unit, multiplier in UNIT_MULTIPLIERS.items():
+            multipliers[_to_numpy(pc.equal(suffix, unit))] = multiplier
+        text = pc.if_else(suffixed, pc.utf8_slice_codeunits(text, 0, -1), text)
+
+    try:
+        numbers = pc.cast(pc.if_else(pc.is_in(text, MISSING), None, text), pa.float64())
+    except pa.ArrowInvalid:
+        # Some cell is not a number at all, null out everything that is not
+        valid = pc.match_substring_regex(text, NUMBER_PATTERN)
+        numbers = pc.cast(pc.if_else(valid, text, None), pa.float64())
+    numbers = _to_numpy(numbers) * multipliers
+    numbers[~np.isfinite(numbers)] = np.nan
+    numbers[blank] = empty
+    return numbers
+
+
+def _parse_numbers_pandas(values, empty=np.nan):
+    text = pd.Series(values, dtype=object).fillna("").astype(str).str.strip()
+    blank = (text == "").to_numpy()
+    text = text.str.replace(",", "", regex=False).str.replace("%", "", regex=False)
+
+    multipliers = text.str[-1:].map(UNIT_MULTIPLIERS)
+    has_suffix = multipliers.notna().to_numpy()
+    if has_suffix.any():
+        text = text.where(~has_suffix, text.str[:-1])
+
+    numbers = pd.to_numeric(text, errors="coerce").to_numpy(dtype="float64")
+    numbers = numbers * multipliers.fillna(1).to_numpy(dtype="float64")
+    numbers[~np.isfinite(numbers)] = np.nan
+    numbers[blank] = empty
+    return numbers
+
+
+def _final_numbers(values, kind):
+    """Scale parsed float64 values of one column to their final dtype"""
+    if kind == "percent":
+        values = values / 100
+    if kind == "int":
+        return pd.array(np.round(values), dtype="Int64")
+    return values
+
+
+def _final_text(series, kind):
+    if kind == "category":
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series
+        return series.fillna("N/A").astype("category")
+    if isinstance(series.dtype, pd.StringDtype):
+        return series
+    return series.fillna("N/A").astype(STRING_DTYPE)
+
+
+def convert_columns(df, column_types=None):
+    """
+    Convert every registered column of a raw export to its final dtype.
+    All text cells of the numeric columns are parsed in one parse_numbers
+    call, and the result is assembled into a new frame in a single step.
+    Columns that are already converted are kept as they are.
+    """
+    column_types = column_types or COLUMN_TYPES
+    numeric = [col for col in df.columns if column_types.get(col) in NUMERIC_KINDS]
+    text_columns = [col for col in numeric if df[col].dtype == object]
+
+    converted = {}
+    if text_columns:
+        block = df[text_columns].to_numpy(dtype=object)
+        parsed = parse_numbers(block.ravel(order="F")).reshape(block.shape, order="F")
+        for position, col in enumerate(text_columns):
+            converted[col] = _final_numbers(parsed[:, position], column_types[col])
+
+    for col in numeric:
+        if col in converted:
+            continue
+        if column_types[col] == "int" and df[col].dtype == "Int64":
+            converted[col] = df[col]
+            continue
+        values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype="float64")
+        converted[col] = _final_numbers(values, "int" if column_types[col] == "int" else "float")
+
+    for col in df.columns:
+        if column_types.get(col) in ("string", "category"):
+            converted[col] = _final_text(df[col], column_types[col])
+
+    return pd.DataFrame(
+        {col: converted.get(col, df[col]) for col in df.columns}, index=df.index
+    )
+
+
+def read_finviz_csv(content, usecols=None, column_types=None):
+    """
+    Parse a Finviz export straight into the final column dtypes.
+    Registered columns are read as Arrow strings and parsed in one
+    parse_numbers call, so the raw text never becomes Python objects.
+    Empty numeric cells become 0 and empty text cells "N/A".
+    Parameters:
+        content (bytes): The CSV export.
+        usecols (list, optional): Only parse these columns.
+    Returns:
+        pd.DataFrame: The typed export, in header order.
+    """
+    column_types = column_types or COLUMN_TYPES
+    if pa_csv is None:
+        wanted = set(usecols) if usecols is not None else None
+        df = pd.read_csv(
+            BytesIO(content),
+            usecols=(lambda col: col in wanted) if wanted is not None else None,
+        )
+        # Empty text cells become "N/A" in convert_columns, like the Arrow path
+        text = [col for col in df.columns if column_types.get(col) in ("string", "category")]
+        df = df.fillna({col: 0 for col in df.columns if col not in text})
+        return convert_columns(df, column_types)
+
+    header_line = content.split(b"\n", 1)[0].decode("utf-8-sig").rstrip("\r")
+    header = next(csv.reader([header_line]), [])
+    columns = [col for col in header if usecols is None or col in usecols]
+    if not columns:
+        return pd.DataFrame([])
+
+    registered = [col for col in columns if col in column_types]
+    table = pa_csv.read_csv(
+        BytesIO(content),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=columns,
+            column_types={col: pa.string() for col in registered},
+            strings_can_be_null=True,
+        ),
+    )
+
+    converted = {}
+    numeric = [col for col in registered if column_types[col] in NUMERIC_KINDS]
+    if numeric:
+        # Parse every numeric column in one pass over a chunked view of them all
+        chunks = [chunk for col in numeric for chunk in table.column(col).chunks]
+        parsed = parse_numbers(pa.chunked_array(chunks, pa.string()), empty=0.0)
+        for position, col in enumerate(numeric):
+            values = parsed[position * table.num_rows : (position + 1) * table.num_rows]
+            converted[col] = _final_numbers(values, column_types[col])
+
+    for col in columns:
+        if col in converted:
+            continue
+        kind = column_types.get(col)
+        if kind == "category":
+            column = pc.fill_null(table.column(col), "N/A").dictionary_encode()
+            converted[col] = column.to_pandas()
+        elif kind == "string":
+            column = pc.fill_null(table.column(col), "N/A")
+            converted[col] = pd.Series(pd.arrays.ArrowStringArray(column))
+        else:
+            # Unregistered columns keep Arrow's inferred type, like read_csv's
+            converted[col] = table.column(col).to_pandas().fillna(0)
+
+    return pd.DataFrame({col: converted[col] for col in columns})
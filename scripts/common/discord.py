@@ -0,0 +1,320 @@
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from common.utils import http_post
+
+# Point this at a local mock server to exercise delivery without Discord.
+# Pinned to a version, the unit of a 429's body retry_after depends on it.
+DISCORD_API_BASE = os.getenv("DISCORD_API_BASE") or "https://discord.com/api/v10"
+DISCORD_API_BASE = DISCORD_API_BASE.rstrip("/")
+DISCORD_WEBHOOK_BASE_URL = f"{DISCORD_API_BASE}/webhooks/"
+# Rate limited attempts of one message before it is given up on
+DISCORD_MAX_ATTEMPTS = int(os.getenv("DISCORD_MAX_ATTEMPTS") or 10)
+# "sync" posts from the scanner's thread, "async" hands messages to the
+# AsyncDispatcher which serves all webhooks of the process concurrently,
+# "outbox" stores them for the outbox worker (8_discord_outbox_worker)
+DISCORD_DELIVERY = os.getenv("DISCORD_DELIVERY") or "sync"
+# Webhook requests in flight at once with the async delivery
+DISCORD_MAX_CONCURRENCY = int(os.getenv("DISCORD_MAX_CONCURRENCY") or 4)
+
+# Discord accepts up to 10 embeds per webhook message, and at most 6000
+# characters summed over all of their titles, descriptions, fields,
+# footers and authors.
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_MESSAGE_CHARACTERS = 6000
+
+
+def embed_length(embed):
+    """Count the characters of an embed that Discord holds against the limit"""
+    length = len(embed.get("title", "")) + len(embed.get("description", ""))
+    length += len(embed.get("footer", {}).get("text", ""))
+    length += len(embed.get("author", {}).get("name", ""))
+    for field in embed.get("fields", []):
+        length += len(field.get("name", "")) + len(field.get("value", ""))
+    return length
+
+
+def pack_embeds(
+    embeds,
+    max_embeds=MAX_EMBEDS_PER_MESSAGE,
+    max_characters=MAX_MESSAGE_CHARACTERS,
+):
+    """
+    Pack embeds, in order, into as few messages as the limits allow.
+    Returns:
+        list: Lists of embeds, one per message.
+    """
+    batches = []
+    batch = []
+    characters = 0
+    for embed in embeds:
+        length = embed_length(embed)
+        if batch and (
+            len(batch) >= max_embeds or characters + length > max_characters
+        ):
+            batches.append(batch)
+            batch = []
+            characters = 0
+        batch.append(embed)
+        characters += length
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class WebhookRateLimit:
+    """
+    Token bucket of one webhook, kept in sync with Discord's response
+    headers. X-RateLimit-Remaining is the number of tokens left and
+    X-RateLimit-Reset-After the time until the bucket is refilled to
+    X-RateLimit-Limit. A 429 empties the bucket for Retry-After seconds.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.limit = None
+        # One request is allowed until the first response reveals the bucket
+        self.remaining = 1
+        self.reset_at = 0.0
+        # Requests sent but not answered, Discord's headers do not count them
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take a token if one is available.
+        Returns:
+            float: 0 when the request may be sent now, otherwise the number
+                of seconds to wait before reserving again.
+        """
+        with self.lock:
+            now = self.clock()
+            if self.limit is None and self.in_flight:
+                # Wait for the first response to reveal the bucket size
+                return UNKNOWN_LIMIT_POLL
+            if self.remaining <= 0 and now >= self.reset_at:
+                # Requests still in flight may land in the new window
+                self.remaining = max((self.limit or 1) - self.in_flight, 0)
+            if self.remaining > 0:
+                self.remaining -= 1
+                self.in_flight += 1
+                return 0.0
+            if now >= self.reset_at:
+                # The window is spent on requests in flight, wait for them
+                return UNKNOWN_LIMIT_POLL
+            return self.reset_at - now
+
+    def release(self):
+        """Return the token of a request that got no response"""
+        with self.lock:
+            self.in_flight = max(self.in_flight - 1, 0)
+            self.remaining += 1
+
+    def update(self, response):
+        """
+        Sync the bucket with a webhook response.
+        Returns:
+            float: The Retry-After delay of a 429, otherwise None.
+        """
+        headers = response.headers
+        with self.lock:
+            now = self.clock()
+            self.in_flight = max(self.in_flight - 1, 0)
+            if headers.get("X-RateLimit-Limit"):
+                self.limit = int(headers["X-RateLimit-Limit"])
+            if headers.get("X-RateLimit-Remaining"):
+                remaining = int(headers["X-RateLimit-Remaining"]) - self.in_flight
+                reset_at = now + float(headers.get("X-RateLimit-Reset-After") or 0)
+                if reset_at > self.reset_at + WINDOW_TOLERANCE:
+                    # A new window started, Discord's count is authoritative
+                    self.remaining = max(remaining, 0)
+                    self.reset_at = reset_at
+                else:
+                    self.remaining = max(min(self.remaining, remaining), 0)
+
+            if response.status_code != 429:
+                return None
+            retry_after = retry_after_seconds(response)
+            self.remaining = 0
+            self.reset_at = max(self.reset_at, now + retry_after)
+            return retry_after
+
+
+def retry_after_seconds(response):
+    """Read the delay of a 429 from its Retry-After header, which is always
+    in seconds, or else from its body, in seconds on the pinned API version"""
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        pass
+    try:
+        return float(response.json()["retry_after"])
+    except (ValueError, KeyError, TypeError):
+        return 1.0
+
+
+# Reset times closer than this belong to the same rate limit window
+WINDOW_TOLERANCE = 0.1
+# Seconds between reservations while the responses to wait for are pending
+UNKNOWN_LIMIT_POLL = 0.05
+
+_rate_limits = {}
+_rate_limits_lock = threading.Lock()
+
+
+def get_rate_limit(webhook_url):
+    """Return the process-wide rate limit state of a webhook"""
+    with _rate_limits_lock:
+        if webhook_url not in _rate_limits:
+            _rate_limits[webhook_url] = WebhookRateLimit()
+        return _rate_limits[webhook_url]
+
+
+def post_webhook(webhook_url, payload, sleep=time.sleep):
+    """
+    Post one message to a Discord webhook as fast as its rate limit allows.
+    Rate limited attempts are retried after Retry-After, up to
+    DISCORD_MAX_ATTEMPTS times.
+    Returns:
+        requests.Response: The last response.
+    """
+    rate_limit = get_rate_limit(webhook_url)
+
+    for _ in range(DISCORD_MAX_ATTEMPTS):
+        delay = rate_limit.reserve()
+        while delay > 0:
+            sleep(delay)
+            delay = rate_limit.reserve()
+
+        response = _post(rate_limit, webhook_url, payload)
+        retry_after = rate_limit.update(response)
+        if retry_after is None:
+            break
+        print(f"Rate limited by Discord, retrying in {retry_after:.2f}s")
+
+    _report(response)
+    return response
+
+
+def _post(rate_limit, webhook_url, payload):
+    headers = {"Content-Type": "application/json"}
+    try:
+        return http_post(webhook_url, json=payload, headers=headers)
+    except requests.exceptions.RequestException:
+        rate_limit.release()
+        raise
+
+
+def _report(response):
+    if response.status_code == 429:
+        logging.error(
+            f"Giving up on a Discord message after {DISCORD_MAX_ATTEMPTS} "
+            "rate limited attempts"
+        )
+    elif not response.ok:
+        print(f"Failed to send alert: {response.text}")
+
+
+class AsyncDispatcher:
+    """
+    Delivers webhook messages from an asyncio loop on a background thread.
+    Every webhook has its own queue and worker, so webhooks are served
+    concurrently while each one keeps its message order and rate limit.
+    Requests run on the shared HTTP session in a thread pool, at most
+    max_concurrency of them at a time across all webhooks.
+    """
+
+    def __init__(self, max_concurrency=DISCORD_MAX_CONCURRENCY):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="discord"
+        )
+        self.loop = asyncio.new_event_loop()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.queues = {}
+        self.workers = {}
+        threading.Thread(
+            target=self.loop.run_forever, name="discord-dispatcher", daemon=True
+        ).start()
+
+    def submit(self, webhook_url, payload):
+        """Queue a message, callable from any thread"""
+        self.loop.call_soon_threadsafe(self._enqueue, webhook_url, payload)
+
+    def drain(self, timeout=None):
+        """Block until every message submitted so far has been delivered"""
+        asyncio.run_coroutine_threadsafe(self._join(), self.loop).result(timeout)
+
+    def close(self):
+        """Deliver what is queued, then stop the workers and the loop"""
+        self.drain()
+        asyncio.run_coroutine_threadsafe(self._stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.executor.shutdown(wait=False)
+
+    async def _stop(self):
+        for worker in self.workers.values():
+            worker.cancel()
+        await asyncio.gather(*self.workers.values(), return_exceptions=True)
+
+    def _enqueue(self, webhook_url, payload):
+        if webhook_url not in self.queues:
+            self.queues[webhook_url] = asyncio.Queue()
+            self.workers[webhook_url] = self.loop.create_task(
+                self._work(webhook_url, self.queues[webhook_url])
+            )
+        self.queues[webhook_url].put_nowait(payload)
+
+    async def _join(self):
+        await asyncio.gather(*(queue.join() for queue in self.queues.values()))
+
+    async def _work(self, webhook_url, queue):
+        while True:
+            payload = await queue.get()
+            try:
+                await self._deliver(webhook_url, payload)
+            except Exception as e:
+                logging.error(f"Could not deliver Discord message: {e}")
+            finally:
+                queue.task_done()
+
+    async def _deliver(self, webhook_url, payload):
+        """The asyncio twin of post_webhook"""
+        rate_limit = get_rate_limit(webhook_url)
+
+        for _ in range(DISCORD_MAX_ATTEMPTS):
+            delay = rate_limit.reserve()
+            while delay > 0:
+                await asyncio.sleep(delay)
+                delay = rate_limit.reserve()
+
+            async with self.semaphore:
+                response = await self.loop.run_in_executor(
+                    self.executor, _post, rate_limit, webhook_url, payload
+                )
+            retry_after = rate_limit.update(response)
+            if retry_after is None:
+                break
+            print(f"Rate limited by Discord, retrying in {retry_after:.2f}s")
+
+        _report(response)
+        return response
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_async_dispatcher():
+    """Return the process-wide AsyncDispatcher, shared by every scanner"""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = AsyncDispatcher()
+            atexit.register(_dispatcher.close)
+        return _dispatcher
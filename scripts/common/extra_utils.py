@@ -1,52 +1,190 @@
-from common.utils import execute_bulk_insert
+import hashlib
+import os
 
+from common.partitions import ensure_monthly_partitions
+from common.utils import execute_bulk_insert, execute_copy_upsert
 
-def bulk_upsert_stocks(connection, cursor, stocks_data):
-    """Bulk upsert stock records"""
-    query = """
-        INSERT INTO stocks_stock (
-            ticker, name, exchange, sector, industry, created_at, updated_at
-        ) VALUES %s
+# "values" sends multi-row INSERT statements (execute_values), "copy"
+# streams the rows into a staging table with COPY and merges them from there
+UPSERT_METHOD = os.getenv("DB_UPSERT_METHOD") or "values"
+UPSERT_METHODS = ("values", "copy")
+# Tells inserted rows (xmax = 0) from updated ones, skipped rows return nothing
+RETURNING_INSERTED = "RETURNING (xmax = 0)"
+
+
+def content_hash(values):
+    """md5 of a row's values, stored to detect rows that did not change"""
+    text = "\x1f".join("" if value is None else str(value) for value in values)
+    return hashlib.md5(text.encode()).hexdigest()
+
+
+def with_content_hash(rows, hashed):
+    """Append the content hash of the first `hashed` values to every row"""
+    return [tuple(row) + (content_hash(row[:hashed]),) for row in rows]
+
+
+def count_upserted(returned, total):
+    """Turn the RETURNING_INSERTED rows into inserted/changed/skipped counts"""
+    inserted = sum(1 for (was_inserted,) in returned if was_inserted)
+    return {
+        "inserted": inserted,
+        "changed": len(returned) - inserted,
+        "skipped": total - len(returned),
+    }
+
+
+def upsert(
+    connection, cursor, table, columns, conflict, values, commit, method, fetch=False
+):
+    """Insert values into table, resolving duplicates with the conflict clause"""
+    if method == "copy":
+        return execute_copy_upsert(
+            connection, cursor, table, columns, conflict, values, commit, fetch
+        )
+    elif method == "values":
+        query = f"""
+        INSERT INTO {table} ({", ".join(columns)}) VALUES %s
+        {conflict}
+        """
+        return execute_bulk_insert(
+            connection, cursor, query, values, commit=commit, fetch=fetch
+        )
+    else:
+        raise ValueError(f"Unknown upsert method '{method}', expected {UPSERT_METHODS}")
+
+
+def bulk_upsert_stocks(
+    connection, cursor, stocks_data, commit=True, method=UPSERT_METHOD
+):
+    """
+    Bulk upsert stock records. Rows whose values match the stored content
+    hash are left alone.
+    Returns:
+        dict: The number of rows inserted, changed and skipped.
+    """
+    columns = [
+        "ticker",
+        "name",
+        "exchange",
+        "sector",
+        "industry",
+        "created_at",
+        "updated_at",
+        "content_hash",
+    ]
+    conflict = f"""
         ON CONFLICT (ticker)
         DO UPDATE SET
             name = EXCLUDED.name,
-            exchange = EXCLUDED.exchange,
+            -- Projected exports cannot request the exchange
+            exchange = CASE WHEN EXCLUDED.exchange = 'N/A'
+                THEN stocks_stock.exchange ELSE EXCLUDED.exchange END,
             sector = EXCLUDED.sector,
             industry = EXCLUDED.industry,
+            content_hash = EXCLUDED.content_hash,
             updated_at = NOW()
+        WHERE stocks_stock.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+        {RETURNING_INSERTED}
         """
-    execute_bulk_insert(connection, cursor, query, stocks_data)
+    # Everything but the timestamps
+    rows = with_content_hash(stocks_data, 5)
+    table = "stocks_stock"
+    returned = upsert(
+        connection, cursor, table, columns, conflict, rows, commit, method, fetch=True
+    )
+    return count_upserted(returned, len(rows))
 
 
-def bulk_upsert_stock_info(connection, cursor, stocks_data):
-    """Bulk upsert stock info records"""
-    query = """
-    INSERT INTO stocks_stockinfo (
-        stock_id, market_cap, avg_volume, current_price,
-        current_volume, updated_at
-    ) VALUES %s
+def bulk_upsert_stock_info(
+    connection, cursor, stocks_data, commit=True, method=UPSERT_METHOD
+):
+    """
+    Bulk upsert stock info records. Rows whose values match the stored
+    content hash are left alone.
+    Returns:
+        dict: The number of rows inserted, changed and skipped.
+    """
+    columns = [
+        "stock_id",
+        "market_cap",
+        "avg_volume",
+        "current_price",
+        "current_volume",
+        "updated_at",
+        "content_hash",
+    ]
+    conflict = f"""
     ON CONFLICT (stock_id)
     DO UPDATE SET
         market_cap = EXCLUDED.market_cap,
         avg_volume = EXCLUDED.avg_volume,
         current_price = EXCLUDED.current_price,
         current_volume = EXCLUDED.current_volume,
+        content_hash = EXCLUDED.content_hash,
         updated_at = NOW()
+    WHERE stocks_stockinfo.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+    {RETURNING_INSERTED}
     """
-    execute_bulk_insert(connection, cursor, query, stocks_data)
+    # Everything but updated_at
+    rows = with_content_hash(stocks_data, 5)
+    table = "stocks_stockinfo"
+    returned = upsert(
+        connection, cursor, table, columns, conflict, rows, commit, method, fetch=True
+    )
+    return count_upserted(returned, len(rows))
 
 
-def bulk_upsert_alerts(connection, cursor, alerts_data):
+def bulk_upsert_alerts(
+    connection, cursor, alerts_data, commit=True, method=UPSERT_METHOD
+):
     """Bulk upsert alert records"""
-    query = """
-    INSERT INTO alerts_alert (
-        stock_id, alert_name, alert_datetime, data,
-        created_at, updated_at
-    ) VALUES %s
+    columns = [
+        "stock_id",
+        "alert_name",
+        "alert_datetime",
+        "data",
+        "created_at",
+        "updated_at",
+    ]
+    conflict = """
     ON CONFLICT (stock_id, alert_name)
     DO UPDATE SET
         alert_datetime = EXCLUDED.alert_datetime,
         data = EXCLUDED.data,
         updated_at = NOW()
     """
-    execute_bulk_insert(connection, cursor, query, alerts_data)
+    table = "alerts_alert"
+    upsert(connection, cursor, table, columns, conflict, alerts_data, commit, method)
+
+
+def bulk_insert_alert_events(
+    connection, cursor, events_data, commit=True, method=UPSERT_METHOD
+):
+    """
+    Append alert records to the alert history, partitioned by month on
+    alert_datetime. The partitions of this and the next month are created
+    first if they are missing.
+    """
+    columns = ["stock_id", "alert_name", "alert_datetime", "data", "created_at"]
+    table = "alerts_alertevent"
+    ensure_monthly_partitions(connection, cursor, table, commit=False)
+    upsert(connection, cursor, table, columns, "", events_data, commit, method)
+
+
+def bulk_insert_stock_quotes(connection, cursor, quotes_data, commit=True):
+    """
+    Append quote records to the quote time series, partitioned by month on
+    ts. Always streamed with COPY, the table only ever receives inserts.
+    """
+    columns = [
+        "stock_id",
+        "ts",
+        "price",
+        "change",
+        "volume",
+        "rel_volume",
+        "market_cap",
+    ]
+    table = "stocks_stockquote"
+    ensure_monthly_partitions(connection, cursor, table, commit=False)
+    upsert(connection, cursor, table, columns, "", quotes_data, commit, "copy")
@@ -0,0 +1,376 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Column units of the Finviz export, as converted by BaseScanner.process_columns:
+# Market Cap and share counts are in millions, Average Volume in thousands,
+# Volume in shares and percentages are fractions (0.15 == 15%).
+PERCENT = 0.01
+
+# Finviz filter code -> (column, multiplier turning the filter value into column units)
+NUMERIC_FILTERS = {
+    "sh_price": ("Price", 1),
+    "sh_relvol": ("Relative Volume", 1),
+    "sh_avgvol": ("Average Volume", 1),
+    "sh_curvol": ("Volume", 1000),
+    "sh_float": ("Shares Float", 1),
+    "sh_outstanding": ("Shares Outstanding", 1),
+    "sh_short": ("Short Float", PERCENT),
+    "sh_insiderown": ("Insider Ownership", PERCENT),
+    "sh_instown": ("Institutional Ownership", PERCENT),
+    "fa_pe": ("P/E", 1),
+    "fa_fpe": ("Forward P/E", 1),
+    "fa_peg": ("PEG", 1),
+    "fa_ps": ("P/S", 1),
+    "fa_pb": ("P/B", 1),
+    "fa_pc": ("P/Cash", 1),
+    "fa_pfcf": ("P/Free Cash Flow", 1),
+    "fa_curratio": ("Current Ratio", 1),
+    "fa_quickratio": ("Quick Ratio", 1),
+    "fa_ltdebteq": ("LT Debt/Equity", 1),
+    "fa_debteq": ("Total Debt/Equity", 1),
+    "fa_div": ("Dividend Yield", PERCENT),
+    "fa_payoutratio": ("Payout Ratio", PERCENT),
+    "fa_eps5years": ("EPS growth past 5 years", PERCENT),
+    "fa_epsyoy": ("EPS growth this year", PERCENT),
+    "fa_epsyoy1": ("EPS growth next year", PERCENT),
+    "fa_estltgrowth": ("EPS growth next 5 years", PERCENT),
+    "fa_epsqoq": ("EPS growth quarter over quarter", PERCENT),
+    "fa_sales5years": ("Sales growth past 5 years", PERCENT),
+    "fa_salesqoq": ("Sales growth quarter over quarter", PERCENT),
+    "fa_roa": ("Return on Assets", PERCENT),
+    "fa_roe": ("Return on Equity", PERCENT),
+    "fa_roi": ("Return on Investment", PERCENT),
+    "fa_grossmargin": ("Gross Margin", PERCENT),
+    "fa_opermargin": ("Operating Margin", PERCENT),
+    "fa_netmargin": ("Profit Margin", PERCENT),
+    "ta_beta": ("Beta", 1),
+    "ta_averagetruerange": ("Average True Range", 1),
+    "ta_gap": ("Gap", PERCENT),
+    "ta_changeopen": ("Change from Open", PERCENT),
+}
+
+# Market cap buckets in millions, matching Finviz's definitions
+CAP_FILTERS = {
+    "mega": (200000, None),
+    "large": (10000, 200000),
+    "mid": (2000, 10000),
+    "small": (300, 2000),
+    "micro": (50, 300),
+    "nano": (None, 50),
+    "largeover": (10000, None),
+    "midover": (2000, None),
+    "smallover": (300, None),
+    "microover": (50, None),
+    "largeunder": (None, 200000),
+    "midunder": (None, 10000),
+    "smallunder": (None, 2000),
+    "microunder": (None, 300),
+}
+
+PERFORMANCE_COLUMNS = {
+    "d": "Change",
+    "1w": "Performance (Week)",
+    "4w": "Performance (Month)",
+    "13w": "Performance (Quarter)",
+    "26w": "Performance (Half Year)",
+    "52w": "Performance (Year)",
+    "ytd": "Performance (YTD)",
+}
+
+SMA_COLUMNS = {
+    "20": "20-Day Simple Moving Average",
+    "50": "50-Day Simple Moving Average",
+    "200": "200-Day Simple Moving Average",
+}
+
+HIGH_LOW_COLUMNS = {
+    "50d": ("50-Day High", "50-Day Low"),
+    "52w": ("52-Week High", "52-Week Low"),
+}
+
+RECOMMENDATION_LEVELS = {
+    "strongbuy": 1,
+    "buy": 2,
+    "hold": 3,
+    "sell": 4,
+    "strongsell": 5,
+}
+
+NUMBER = r"\d+(?:\.\d+)?"
+
+
+class UnsupportedFilterError(ValueError):
+    """Raised when a Finviz filter token cannot be evaluated locally"""
+
+
+def _column(df, name):
+    if name not in df.columns:
+        raise UnsupportedFilterError(f"Column '{name}' is not in the universe")
+    return pd.to_numeric(df[name], errors="coerce").to_numpy(dtype="float64")
+
+
+def _between(values, low=None, high=None):
+    mask = ~np.isnan(values)
+    if low is not None:
+        mask &= values >= low
+    if high is not None:
+        mask &= values <= high
+    return mask
+
+
+def _numeric_option(option, scale):
+    """Translate an option such as o5, u30, 10to50, pos or neg into bounds"""
+    if option == "pos":
+        return lambda values: values > 0
+    if option == "neg":
+        return lambda values: values < 0
+
+    match = re.fullmatch(rf"([ou])({NUMBER})", option)
+    if match:
+        limit = float(match.group(2)) * scale
+        if match.group(1) == "o":
+            return lambda values: values > limit
+        return lambda values: values < limit
+
+    match = re.fullmatch(rf"({NUMBER})to({NUMBER})", option)
+    if match:
+        low = float(match.group(1)) * scale
+        high = float(match.group(2)) * scale
+        return lambda values: _between(values, low, high)
+
+    return None
+
+
+def _compile_numeric(code, option):
+    column, scale = NUMERIC_FILTERS[code]
+    predicate = _numeric_option(option, scale)
+    if predicate is None:
+        return None
+    return lambda df: predicate(_column(df, column))
+
+
+def _compile_cap(option):
+    if option not in CAP_FILTERS:
+        return None
+    low, high = CAP_FILTERS[option]
+    return lambda df: _between(_column(df, "Market Cap"), low, high)
+
+
+def _compile_performance(option):
+    match = re.fullmatch(rf"(d|1w|4w|13w|26w|52w|ytd)(up|down|{NUMBER}[ou])", option)
+    if not match:
+        return None
+    column = PERFORMANCE_COLUMNS[match.group(1)]
+    direction = match.group(2)
+    if direction == "up":
+        return lambda df: _column(df, column) > 0
+    if direction == "down":
+        return lambda df: _column(df, column) < 0
+
+    limit = float(direction[:-1]) * PERCENT
+    if direction.endswith("o"):
+        return lambda df: _column(df, column) >= limit
+    return lambda df: _column(df, column) <= -limit
+
+
+def _compile_sma(period, option):
+    if period not in SMA_COLUMNS:
+        return None
+    column = SMA_COLUMNS[period]
+
+    if option == "pa":
+        return lambda df: _column(df, column) > 0
+    if option == "pb":
+        return lambda df: _column(df, column) < 0
+
+    # The export holds the price's distance from each SMA, so
+    # SMA(a) > SMA(b) <=> price / (1 + d_a) > price / (1 + d_b) <=> d_a < d_b
+    match = re.fullmatch(r"s([ab])(20|50|200)", option)
+    if not match or match.group(2) == period:
+        return None
+    other = SMA_COLUMNS[match.group(2)]
+    if match.group(1) == "a":
+        return lambda df: _column(df, column) < _column(df, other)
+    return lambda df: _column(df, column) > _column(df, other)
+
+
+def _compile_high_low(period, option):
+    if period not in HIGH_LOW_COLUMNS:
+        return None
+    high_column, low_column = HIGH_LOW_COLUMNS[period]
+
+    # High columns hold the (negative) distance below the high,
+    # low columns the (positive) distance above the low.
+    if option == "nh":
+        return lambda df: _column(df, high_column) >= 0
+    if option == "nl":
+        return lambda df: _column(df, low_column) <= 0
+
+    match = re.fullmatch(rf"([ab])({NUMBER})(?:to({NUMBER}))?([hl])", option)
+    if not match:
+        return None
+    side, first, second, anchor = match.groups()
+    if (side, anchor) not in (("b", "h"), ("a", "l")):
+        return None
+
+    if second is None:
+        low, high = float(first) * PERCENT, None
+    else:
+        low, high = float(first) * PERCENT, float(second) * PERCENT
+
+    if anchor == "h":
+        return lambda df: _between(-_column(df, high_column), low, high)
+    return lambda df: _between(_column(df, low_column), low, high)
+
+
+def _compile_rsi(option):
+    match = re.fullmatch(r"(ob|os|nob|nos)(\d+)", option)
+    if not match:
+        return None
+    kind, level = match.group(1), float(match.group(2))
+    column = "Relative Strength Index (14)"
+    if kind in ("ob", "nos"):
+        return lambda df: _column(df, column) > level
+    return lambda df: _column(df, column) < level
+
+
+def _compile_recommendation(option):
+    match = re.fullmatch(r"(strongbuy|buy|hold|sell|strongsell)(better|worse)", option)
+    if not match:
+        return None
+    level = RECOMMENDATION_LEVELS[match.group(1)]
+    if match.group(2) == "better":
+        return lambda df: _column(df, "Analyst Recom") <= level
+    return lambda df: _column(df, "Analyst Recom") >= level
+
+
+def _compile_option_short(option):
+    columns = {
+        "option": ["Optionable"],
+        "short": ["Shortable"],
+        "optionshort": ["Optionable", "Shortable"],
+    }.get(option)
+    if columns is None:
+        return None
+
+    def predicate(df):
+        mask = np.ones(len(df), dtype=bool)
+        for column in columns:
+            if column not in df.columns:
+                raise UnsupportedFilterError(f"Column '{column}' is not in the universe")
+            mask &= (df[column].astype("string") == "Yes").fillna(False).to_numpy()
+        return mask
+
+    return predicate
+
+
+def _compile_surprise(option):
+    columns = {"e": ["EPS Surprise"], "r": ["Revenue Surprise"]}
+    columns["b"] = columns["e"] + columns["r"]
+    match = re.fullmatch(r"([ebr])([pn])", option)
+    if not match:
+        return None
+    selected = columns[match.group(1)]
+    positive = match.group(2) == "p"
+
+    def predicate(df):
+        mask = np.ones(len(df), dtype=bool)
+        for column in selected:
+            values = _column(df, column)
+            mask &= values > 0 if positive else values < 0
+        return mask
+
+    return predicate
+
+
+def _compile_earnings_date(option, today=None):
+    match = re.fullmatch(r"(today|yesterday|tomorrow|prevdays(\d+)|nextdays(\d+))", option)
+    if not match:
+        return None
+
+    def predicate(df):
+        if "Earnings Date" not in df.columns:
+            raise UnsupportedFilterError("Column 'Earnings Date' is not in the universe")
+        day = today or pd.Timestamp.now(tz="America/New_York").tz_localize(None)
+        day = np.datetime64(pd.Timestamp(day).normalize().date(), "D")
+        dates = (
+            pd.to_datetime(df["Earnings Date"], format="mixed", errors="coerce")
+            .dt.normalize()
+            .to_numpy(dtype="datetime64[D]")
+        )
+
+        if option == "today":
+            low = high = day
+        elif option == "yesterday":
+            low = high = np.busday_offset(day, -1, roll="backward")
+        elif option == "tomorrow":
+            low = high = np.busday_offset(day, 1, roll="forward")
+        elif match.group(2):
+            low, high = np.busday_offset(day, -int(match.group(2)), roll="backward"), day
+        else:
+            low, high = day, np.busday_offset(day, int(match.group(3)), roll="forward")
+
+        return ~np.isnat(dates) & (dates >= low) & (dates <= high)
+
+    return predicate
+
+
+def compile_filter_token(token, today=None):
+    """
+    Compile one Finviz filter token into a predicate over a typed universe.
+    Returns:
+        callable: Takes a DataFrame and returns a boolean NumPy array.
+    Raises:
+        UnsupportedFilterError: If the token has no local equivalent.
+    """
+    predicate = None
+    parts = token.split("_")
+
+    if len(parts) == 3 and "_".join(parts[:2]) in NUMERIC_FILTERS:
+        predicate = _compile_numeric("_".join(parts[:2]), parts[2])
+    elif len(parts) == 2:
+        prefix, option = parts
+        if prefix == "cap":
+            predicate = _compile_cap(option)
+        elif prefix == "earningsdate":
+            predicate = _compile_earnings_date(option, today)
+    elif len(parts) == 3:
+        prefix, code, option = parts
+        if prefix == "ta" and code in ("perf", "perf2"):
+            predicate = _compile_performance(option)
+        elif prefix == "ta" and code.startswith("sma"):
+            predicate = _compile_sma(code[3:], option)
+        elif prefix == "ta" and code.startswith("highlow"):
+            predicate = _compile_high_low(code[7:], option)
+        elif prefix == "ta" and code == "rsi":
+            predicate = _compile_rsi(option)
+        elif prefix == "an" and code == "recom":
+            predicate = _compile_recommendation(option)
+        elif prefix == "sh" and code == "opt":
+            predicate = _compile_option_short(option)
+        elif prefix == "fa" and code == "epsrev":
+            predicate = _compile_surprise(option)
+
+    if predicate is None:
+        raise UnsupportedFilterError(f"Unsupported Finviz filter '{token}'")
+    return predicate
+
+
+def compile_filters(filter_params, today=None):
+    """
+    Compile a comma separated Finviz filter string, e.g.
+    "sh_price_u30,sh_relvol_o5,ta_perf_d15o,ta_rsi_ob70", into one predicate
+    that ANDs every token like the Finviz screener does.
+    """
+    tokens = [token.strip() for token in filter_params.split(",") if token.strip()]
+    predicates = [compile_filter_token(token, today) for token in tokens]
+
+    def predicate(df):
+        mask = np.ones(len(df), dtype=bool)
+        for token_predicate in predicates:
+            mask &= np.asarray(token_predicate(df), dtype=bool)
+        return mask
+
+    return predicate
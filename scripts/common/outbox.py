@@ -0,0 +1,104 @@
+import json
+import os
+
+from common.utils import execute_bulk_insert
+
+# Delivery attempts before a message is marked failed
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS") or 8)
+# Seconds a claimed message stays hidden from other workers. Longer than
+# any delivery, so a message is only claimed again if its worker died.
+OUTBOX_LEASE_SECONDS = int(os.getenv("OUTBOX_LEASE_SECONDS") or 300)
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE") or 50)
+# Upper bound of the exponential backoff between attempts
+OUTBOX_MAX_BACKOFF_SECONDS = 900
+
+
+def enqueue_messages(connection, cursor, scanner, messages, commit=True):
+    """
+    Insert rendered messages into the outbox.
+    Parameters:
+        scanner (str): Name of the scanner that rendered the messages.
+        messages (list): (webhook_url, payload) pairs.
+        commit (bool): False to write them in the caller's transaction.
+    """
+    query = """
+    INSERT INTO alerts_outboxmessage (
+        scanner, webhook_url, payload, status, attempts,
+        available_at, last_error, created_at
+    ) VALUES %s
+    """
+    rows = [
+        (scanner, webhook_url, json.dumps(payload), "pending", 0, "NOW()", "", "NOW()")
+        for webhook_url, payload in messages
+    ]
+    execute_bulk_insert(connection, cursor, query, rows, commit=commit)
+
+
+def claim_messages(
+    connection, cursor, limit=OUTBOX_BATCH_SIZE, lease_seconds=OUTBOX_LEASE_SECONDS
+):
+    """
+    Lease up to `limit` due messages to this worker, oldest first.
+    Rows locked by another worker's claim are skipped, and a leased row
+    only becomes due again when its lease runs out, so concurrent workers
+    never pick up the same message.
+    Returns:
+        list: (id, webhook_url, payload, attempts) tuples.
+    """
+    cursor.execute(
+        """
+        UPDATE alerts_outboxmessage AS outbox
+        SET attempts = outbox.attempts + 1,
+            available_at = NOW() + make_interval(secs => %s)
+        WHERE outbox.id IN (
+            SELECT id FROM alerts_outboxmessage
+            WHERE status = 'pending' AND available_at <= NOW()
+            ORDER BY available_at, id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING outbox.id, outbox.webhook_url, outbox.payload, outbox.attempts
+        """,
+        (lease_seconds, limit),
+    )
+    messages = cursor.fetchall()
+    connection.commit()
+    # RETURNING does not keep the subquery's order
+    return sorted(messages, key=lambda message: message[0])
+
+
+def mark_sent(connection, cursor, message_id):
+    cursor.execute(
+        """
+        UPDATE alerts_outboxmessage
+        SET status = 'sent', sent_at = NOW(), last_error = ''
+        WHERE id = %s
+        """,
+        (message_id,),
+    )
+    connection.commit()
+
+
+def is_permanent_failure(status_code):
+    """Client errors other than 429 fail the same way on every attempt"""
+    return 400 <= status_code < 500 and status_code != 429
+
+
+def mark_failed(connection, cursor, message_id, attempts, error, permanent=False):
+    """Schedule another attempt with exponential backoff, or give up.
+    Permanent failures are given up on right away."""
+    if permanent or attempts >= OUTBOX_MAX_ATTEMPTS:
+        status, backoff = "failed", 0
+    else:
+        status, backoff = "pending", min(5 * 2**attempts, OUTBOX_MAX_BACKOFF_SECONDS)
+    cursor.execute(
+        """
+        UPDATE alerts_outboxmessage
+        SET status = %s,
+            available_at = NOW() + make_interval(secs => %s),
+            last_error = %s
+        WHERE id = %s
+        """,
+        (status, backoff, error, message_id),
+    )
+    connection.commit()
@@ -0,0 +1,104 @@
+import os
+from datetime import date, datetime, timezone
+
+# Months after the current one that get their partition ahead of time
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD") or 1)
+
+
+def month_start(value):
+    """First day of the month of a date or datetime"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_bounds(month):
+    """The UTC range of a month partition, as timestamptz literals"""
+    upper = add_months(month, 1)
+    return f"{month:%Y-%m-%d} 00:00:00+00", f"{upper:%Y-%m-%d} 00:00:00+00"
+
+
+def list_partitions(cursor, table):
+    """Names of the partitions attached to table"""
+    cursor.execute(
+        """
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = %s
+        """,
+        (table,),
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+
+def ensure_monthly_partitions(
+    connection,
+    cursor,
+    table,
+    start=None,
+    months_ahead=PARTITION_MONTHS_AHEAD,
+    commit=True,
+):
+    """
+    Create the missing monthly partitions of a table range partitioned on a
+    timestamptz column, from the month of `start` (default now) through
+    `months_ahead` months later. Existing partitions are looked up first,
+    so the parent is only locked when a partition is actually created.
+    Returns:
+        list: The names of the created partitions.
+    """
+    first = month_start(start or datetime.now(timezone.utc))
+    existing = list_partitions(cursor, table)
+
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(first, offset)
+        name = partition_name(table, month)
+        if name in existing:
+            continue
+        lower, upper = partition_bounds(month)
+        cursor.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table}
+            FOR VALUES FROM (%s) TO (%s)
+            """,
+            (lower, upper),
+        )
+        created.append(name)
+
+    if commit:
+        connection.commit()
+    return created
+
+
+def drop_partitions_before(connection, cursor, table, before, commit=True):
+    """
+    Drop the monthly partitions of table for the months before the month
+    of `before`. Dropping a partition removes a month of rows without
+    scanning or vacuuming anything.
+    Returns:
+        list: The names of the dropped partitions.
+    """
+    cutoff = partition_name(table, month_start(before))
+    prefix = f"{table}_y"
+    dropped = sorted(
+        name
+        for name in list_partitions(cursor, table)
+        # The names sort by month, which keeps other partitions out
+        if name.startswith(prefix) and len(name) == len(cutoff) and name < cutoff
+    )
+    for name in dropped:
+        cursor.execute(f"DROP TABLE {name}")
+
+    if commit:
+        connection.commit()
+    return dropped
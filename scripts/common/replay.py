@@ -0,0 +1,163 @@
+"""
+Replay archived Finviz snapshots through the scanners without touching
+Finviz, Discord or the database.
+
+    python -m common.replay <snapshot file or directory> [--scanners 3_momentum_gap_bot ...]
+        [--output alerts.jsonl]
+"""
+
+import argparse
+import copy
+import glob
+import gzip
+import json
+import os
+import re
+import time
+
+from common.columns import read_finviz_csv
+from common.finviz_filters import UnsupportedFilterError
+from common.scanners import load_scanner_classes
+from common.snapshot_store import MANIFEST_NAME, list_snapshots, load_snapshot
+
+UNIVERSE = "universe"
+SCANNER_PARTITION = re.compile(r"scanner=([^/\\]+)")
+
+
+class ReplaySink:
+    """
+    Collects the Discord payloads of a replay instead of posting them.
+    Footers carry the wall-clock time, so they are dropped by default to
+    keep the output of two replays comparable.
+    """
+
+    def __init__(self, path=None, keep_footer=False):
+        self.path = path
+        self.keep_footer = keep_footer
+        self.snapshot = None
+        self.messages = 0
+        self._file = open(path, "w") if path else None
+
+    def __call__(self, scanner, payload):
+        payload = copy.deepcopy(payload)
+        if not self.keep_footer:
+            for embed in payload.get("embeds", []):
+                embed.pop("footer", None)
+
+        self.messages += 1
+        if self._file:
+            record = {
+                "snapshot": self.snapshot,
+                "scanner": type(scanner).__name__,
+                "payload": payload,
+            }
+            self._file.write(json.dumps(record, default=str) + "\n")
+
+    def close(self):
+        if self._file:
+            self._file.close()
+
+
+def snapshot_files(source):
+    """
+    List (path, scanner) pairs for a snapshot file or directory, oldest first.
+    CSV files are treated as raw universe exports.
+    """
+    if os.path.isfile(source):
+        paths = [source]
+    elif os.path.exists(os.path.join(source, MANIFEST_NAME)):
+        paths = list_snapshots(root=source)["path"].tolist()
+    else:
+        paths = sorted(
+            path
+            for pattern in ("*.parquet", "*.csv", "*.csv.gz")
+            for path in glob.glob(os.path.join(source, "**", pattern), recursive=True)
+        )
+
+    files = []
+    for path in paths:
+        match = SCANNER_PARTITION.search(path)
+        files.append((path, match.group(1) if match else UNIVERSE))
+    return files
+
+
+def load_frame(path):
+    if path.endswith(".parquet"):
+        return load_snapshot(path)
+    with open(path, "rb") as snapshot_file:
+        content = snapshot_file.read()
+    if path.endswith(".gz"):
+        content = gzip.decompress(content)
+    return read_finviz_csv(content)
+
+
+def replay(scanner_classes, source, sink):
+    """
+    Run every scanner over every snapshot in `source`.
+    Universe snapshots are screened locally with each scanner's filters,
+    per-scanner snapshots are only fed to the scanner that recorded them.
+    Returns:
+        dict: Run statistics.
+    """
+    scanners = []
+    for scanner_class in scanner_classes:
+        scanner = scanner_class()
+        scanner.discord_sink = sink
+        scanner.dry_run = True
+        scanners.append(scanner)
+
+    stats = {"snapshots": 0, "scanner_runs": 0, "skipped": 0}
+    started = time.perf_counter()
+
+    for path, recorded_by in snapshot_files(source):
+        df = load_frame(path)
+        sink.snapshot = path
+        stats["snapshots"] += 1
+
+        typed = None
+        if recorded_by == UNIVERSE and scanners:
+            typed = scanners[0].process_columns(df.copy())
+
+        for scanner in scanners:
+            if recorded_by == UNIVERSE:
+                try:
+                    frame = scanner.screen_universe(df, typed, scanner.get_filter_params())
+                except UnsupportedFilterError as e:
+                    print(f"Skipping {type(scanner).__name__}: {e}")
+                    stats["skipped"] += 1
+                    continue
+            elif recorded_by == type(scanner).__name__:
+                frame = df
+            else:
+                continue
+
+            scanner.run_scanner(snapshot=frame)
+            stats["scanner_runs"] += 1
+
+    stats["messages"] = sink.messages
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay archived Finviz snapshots")
+    parser.add_argument("source", help="Snapshot file or archive directory")
+    parser.add_argument(
+        "--scanners", nargs="*", help="Bot directories or class names, default all"
+    )
+    parser.add_argument("--output", help="Write the Discord payloads to this JSONL file")
+    parser.add_argument(
+        "--keep-footer", action="store_true", help="Keep the timestamped embed footers"
+    )
+    args = parser.parse_args()
+
+    sink = ReplaySink(args.output, keep_footer=args.keep_footer)
+    try:
+        stats = replay(load_scanner_classes(args.scanners), args.source, sink)
+    finally:
+        sink.close()
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import glob
+import importlib.util
+import inspect
+import os
+
+from common.base_scanner import BaseScanner
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The scanner bots. 0_scanner_orchestrator and 8_discord_outbox_worker are
+# functions of their own, deploy_cloud_functions.sh copies the same set.
+SCANNER_DIRECTORY_PATTERN = "[1-7]_*"
+
+
+def scanner_directories(scripts_dir=SCRIPTS_DIR):
+    """Return {"3_momentum_gap_bot": "<path>/main.py", ...} for every bot directory"""
+    pattern = os.path.join(scripts_dir, SCANNER_DIRECTORY_PATTERN, "main.py")
+    paths = sorted(glob.glob(pattern))
+    return {os.path.basename(os.path.dirname(path)): path for path in paths}
+
+
+def load_scanner_classes(names=None, scripts_dir=SCRIPTS_DIR):
+    """
+    Import the BaseScanner subclass of each bot's main.py.
+    Parameters:
+        names (list, optional): Directory names ("3_momentum_gap_bot") or
+            class names ("MomentumGapScanner") to load. Defaults to all.
+    Returns:
+        list: The scanner classes, in directory order.
+    """
+    classes = []
+    for directory, path in scanner_directories(scripts_dir).items():
+        module_name = f"scanner_{directory}"
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if not issubclass(cls, BaseScanner) or cls is BaseScanner:
+                continue
+            if cls.__module__ != module_name:
+                continue
+            if names is None or directory in names or cls.__name__ in names:
+                classes.append(cls)
+    return classes
@@ -0,0 +1,75 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+ENTERED = "entered"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+EXITED = "exited"
+
+
+class SnapshotDiff(NamedTuple):
+    """A scanner's result set compared with the one of its previous run"""
+
+    # ENTERED, CHANGED or UNCHANGED for every row of the current result set
+    status: np.ndarray
+    # Rows of the previous result set that are no longer in the current one
+    exited: pd.DataFrame
+
+    def mask(self, *statuses):
+        return np.isin(self.status, statuses)
+
+    def counts(self):
+        counts = {
+            status: int((self.status == status).sum())
+            for status in (ENTERED, CHANGED, UNCHANGED)
+        }
+        counts[EXITED] = len(self.exited)
+        return counts
+
+
+def _changed(current, previous, tolerance):
+    """Flag the values of current that differ from previous by more than tolerance"""
+    is_numeric = pd.api.types.is_numeric_dtype
+    if is_numeric(current) and is_numeric(previous):
+        current = current.to_numpy(dtype="float64", na_value=np.nan)
+        previous = previous.to_numpy(dtype="float64", na_value=np.nan)
+        with np.errstate(invalid="ignore"):
+            moved = np.abs(current - previous) > (tolerance or 0)
+        # A value that appeared or disappeared is a change, two missing ones are not
+        return moved | (np.isnan(current) != np.isnan(previous))
+    # Text and categories compare by their labels, missing values included
+    return current.astype(str).to_numpy() != previous.astype(str).to_numpy()
+
+
+def diff_snapshots(current, previous, columns):
+    """
+    Merge the current result set with the previous one on Ticker and
+    classify every current row as entered, changed or unchanged.
+    Parameters:
+        columns (dict): Compared columns, mapped to the smallest absolute
+            change that counts (None or 0 for any change).
+    Returns:
+        SnapshotDiff
+    """
+    if previous is None or previous.empty:
+        status = np.full(len(current), ENTERED, dtype=object)
+        return SnapshotDiff(status, current.iloc[0:0])
+
+    previous = previous.drop_duplicates("Ticker", keep="last")
+    positions = pd.Index(previous["Ticker"]).get_indexer(current["Ticker"])
+    known = positions >= 0
+    matched = previous.iloc[np.where(known, positions, 0)]
+
+    changed = np.zeros(len(current), dtype=bool)
+    for column, tolerance in columns.items():
+        if column not in previous.columns:
+            # Nothing to compare against, every known row counts as changed
+            changed[:] = True
+            continue
+        changed |= _changed(current[column], matched[column], tolerance)
+
+    status = np.where(known, np.where(changed, CHANGED, UNCHANGED), ENTERED)
+    exited = previous[~previous["Ticker"].isin(current["Ticker"])]
+    return SnapshotDiff(status.astype(object), exited)
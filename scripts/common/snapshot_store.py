@@ -0,0 +1,100 @@
+import json
+import logging
+import os
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # The archive is optional, scanners run without it
+    pa = None
+    pq = None
+
+# Archiving is enabled by pointing this at a (shared) directory
+SNAPSHOT_ARCHIVE_DIR = os.getenv("SNAPSHOT_ARCHIVE_DIR")
+MANIFEST_NAME = "manifest.jsonl"
+
+
+def archive_enabled(root=None):
+    return bool(root or SNAPSHOT_ARCHIVE_DIR) and pq is not None
+
+
+def _to_table(df):
+    """Convert to an Arrow table, storing leftover mixed object columns as strings"""
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].astype("string")
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def archive_snapshot(df, scanner, taken_at=None, root=None):
+    """
+    Persist a processed DataFrame as a zstd compressed Parquet file under
+    <root>/date=YYYY-MM-DD/scanner=<scanner>/HHMMSSffffff.parquet and
+    record it in the manifest.
+    Returns:
+        str: The path of the written file, or None if archiving is disabled.
+    """
+    root = root or SNAPSHOT_ARCHIVE_DIR
+    if not archive_enabled(root) or df is None:
+        return None
+
+    taken_at = taken_at or datetime.now()
+    directory = os.path.join(root, f"date={taken_at:%Y-%m-%d}", f"scanner={scanner}")
+    path = os.path.join(directory, f"{taken_at:%H%M%S%f}.parquet")
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        pq.write_table(_to_table(df), path + ".tmp", compression="zstd")
+        os.replace(path + ".tmp", path)
+
+        entry = {
+            "path": os.path.relpath(path, root),
+            "scanner": scanner,
+            "taken_at": taken_at.isoformat(),
+            "rows": len(df),
+            "columns": len(df.columns),
+        }
+        # Single short appends are atomic, so concurrent writers do not interleave
+        with open(os.path.join(root, MANIFEST_NAME), "a") as manifest:
+            manifest.write(json.dumps(entry) + "\n")
+    except OSError as e:
+        logging.error(f"Could not archive snapshot '{path}': {e}")
+        return None
+
+    return path
+
+
+def list_snapshots(scanner=None, start=None, end=None, root=None):
+    """
+    Read the manifest index.
+    Returns:
+        pd.DataFrame: One row per archived snapshot, oldest first.
+    """
+    root = root or SNAPSHOT_ARCHIVE_DIR
+    manifest_path = os.path.join(root or "", MANIFEST_NAME)
+    if not root or not os.path.exists(manifest_path):
+        return pd.DataFrame(columns=["path", "scanner", "taken_at", "rows", "columns"])
+
+    manifest = pd.read_json(manifest_path, lines=True, dtype={"taken_at": False})
+    manifest["taken_at"] = pd.to_datetime(manifest["taken_at"])
+    manifest["path"] = [os.path.join(root, path) for path in manifest["path"]]
+
+    if scanner is not None:
+        manifest = manifest[manifest["scanner"] == scanner]
+    if start is not None:
+        manifest = manifest[manifest["taken_at"] >= pd.Timestamp(start)]
+    if end is not None:
+        manifest = manifest[manifest["taken_at"] <= pd.Timestamp(end)]
+    return manifest.sort_values("taken_at").reset_index(drop=True)
+
+
+def load_snapshot(path, columns=None):
+    """Memory-map an archived snapshot back into a DataFrame"""
+    if pq is None:
+        raise ImportError("pyarrow is required to read archived snapshots")
+    table = pq.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas()
@@ -0,0 +1,103 @@
+import json
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+class Realert(NamedTuple):
+    """Lifts the cooldown of a ticker whose metric moved far enough"""
+
+    # Frame column with the current value
+    column: str
+    # Key of the value in the alert's stored data (alerts_alert.data)
+    data_key: str
+    # Smallest change that counts as a move
+    min_move: float
+    # min_move is a fraction of the previous value instead of an absolute change
+    relative: bool = False
+
+
+class AlertIndex:
+    """
+    The latest alert of one scanner per ticker: when it was sent and the
+    metrics it was sent with. Lookups of a whole frame are a single
+    get_indexer call, so filtering is a vectorized anti-join.
+    """
+
+    def __init__(self, frame):
+        # Indexed by ticker, an "alerted_at" column plus one per data key
+        self.frame = frame
+
+    @classmethod
+    def empty(cls, data_keys=()):
+        return cls.from_rows([], data_keys)
+
+    @classmethod
+    def from_rows(cls, rows, data_keys=()):
+        """Build the index from (ticker, alert_datetime, data) rows"""
+        tickers = pd.Index([row[0] for row in rows], name="Ticker")
+        frame = pd.DataFrame(
+            {"alerted_at": pd.to_datetime([row[1] for row in rows], utc=True)},
+            index=tickers,
+        )
+        # psycopg2 decodes jsonb to dicts, plain json columns arrive as text
+        data = [
+            row[2] if isinstance(row[2], dict) else json.loads(row[2] or "{}")
+            for row in rows
+        ]
+        for key in data_keys:
+            values = pd.Series([item.get(key) for item in data], dtype=object)
+            values = pd.to_numeric(values, errors="coerce")
+            frame[key] = values.to_numpy(dtype="float64", na_value=np.nan)
+        return cls(frame)
+
+    @classmethod
+    def load(cls, cursor, alert_name, cooldown, data_keys=()):
+        """Read the alerts sent within `cooldown` (a timedelta) from alerts_alert"""
+        cursor.execute(
+            """
+            SELECT stock_id, alert_datetime, data
+            FROM alerts_alert
+            WHERE alert_name = %s
+              AND alert_datetime >= NOW() - make_interval(secs => %s)
+            """,
+            (alert_name, cooldown.total_seconds()),
+        )
+        return cls.from_rows(cursor.fetchall(), data_keys)
+
+    def suppressed(self, df, cooldown, realert=(), now=None):
+        """
+        Flag the rows of df whose ticker was alerted within `cooldown` and
+        whose realert metrics have not moved since. A metric that was not
+        stored with the previous alert never counts as moved.
+        Returns:
+            np.ndarray: A boolean mask over the rows of df.
+        """
+        now = pd.Timestamp.now(tz="UTC") if now is None else pd.Timestamp(now)
+        if now.tzinfo is None:
+            now = now.tz_localize("UTC")
+        positions = self.frame.index.get_indexer(df["Ticker"])
+        known = positions >= 0
+        positions = np.where(known, positions, 0)
+
+        if not known.any():
+            return known
+
+        # Compare as naive UTC datetime64 values
+        alerted_at = self.frame["alerted_at"].to_numpy(dtype="datetime64[ns]")
+        since = (now - cooldown).tz_convert("UTC").tz_localize(None).to_datetime64()
+        recent = known & (alerted_at[positions] >= since)
+
+        moved = np.zeros(len(df), dtype=bool)
+        for rule in realert:
+            previous = self.frame[rule.data_key].to_numpy()[positions]
+            current = df[rule.column].to_numpy(dtype="float64", na_value=np.nan)
+            change = np.abs(current - previous)
+            if rule.relative:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    change = change / np.abs(previous)
+            # NaN comparisons are False, so missing values never count as moves
+            moved |= change >= rule.min_move
+
+        return recent & ~moved
@@ -0,0 +1,143 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import pandas as pd
+from common.columns import read_finviz_csv
+from common.snapshot_store import archive_snapshot
+from common.utils import build_and_print_url, fetch_csv_as_dataframe
+
+FINVIZ_EXPORT_URL = "https://elite.finviz.com/export.ashx"
+FINVIZ_ALL_COLUMNS = ",".join([str(num) for num in range(1, 201)])
+
+# One "tick" is the window in which every scanner shares the same export.
+# Scheduler jobs fire five minutes apart; widen the tick to share it further.
+UNIVERSE_TICK_SECONDS = int(os.getenv("UNIVERSE_TICK_SECONDS") or 600)
+# A shared mount (e.g. a Cloud Storage FUSE volume) through which separately
+# deployed scanners reuse one download. Without it each scanner downloads its
+# own filtered export, unless it shares a process with the other scanners.
+UNIVERSE_SNAPSHOT_DIR = os.getenv("UNIVERSE_SNAPSHOT_DIR") or None
+
+# Survives across warm invocations of the same Cloud Function instance
+_snapshot = {"tick": None, "df": None, "typed": None, "downloaded": False}
+# Scanners running on threads of one process share the snapshot
+_snapshot_lock = threading.RLock()
+
+
+def universe_snapshot_shared():
+    """Whether scanners deployed on their own can share the universe download"""
+    return UNIVERSE_SNAPSHOT_DIR is not None
+
+
+def current_tick(now=None):
+    """Return the index of the snapshot window containing `now`"""
+    now = time.time() if now is None else now
+    return int(now // UNIVERSE_TICK_SECONDS)
+
+
+def snapshot_path(tick):
+    return os.path.join(UNIVERSE_SNAPSHOT_DIR, f"universe_{tick}.pkl")
+
+
+def download_universe(finviz_email):
+    """Download the unfiltered, all-column Finviz export"""
+    params = {
+        "v": "152",
+        "f": "",
+        "ft": "4",
+        "c": FINVIZ_ALL_COLUMNS,
+        "auth": f"{finviz_email}",
+    }
+    df = fetch_csv_as_dataframe(FINVIZ_EXPORT_URL, params, parser=read_finviz_csv)
+    build_and_print_url(FINVIZ_EXPORT_URL, params)
+    print(f"Downloaded universe snapshot of {len(df)} stocks from Finviz")
+    return df
+
+
+def write_snapshot(df, tick):
+    """Atomically store the snapshot so concurrent readers never see a partial file"""
+    if not universe_snapshot_shared():
+        return
+    os.makedirs(UNIVERSE_SNAPSHOT_DIR, exist_ok=True)
+    path = snapshot_path(tick)
+    fd, tmp_path = tempfile.mkstemp(dir=UNIVERSE_SNAPSHOT_DIR, suffix=".tmp")
+    with os.fdopen(fd, "wb") as tmp_file:
+        # Pickle keeps the typed columns, so readers skip parsing entirely
+        df.to_pickle(tmp_file)
+    os.replace(tmp_path, path)
+
+    # Older ticks are never read again
+    for name in os.listdir(UNIVERSE_SNAPSHOT_DIR):
+        if name.startswith("universe_") and name != os.path.basename(path):
+            try:
+                os.remove(os.path.join(UNIVERSE_SNAPSHOT_DIR, name))
+            except OSError:
+                pass
+
+
+def read_snapshot(tick):
+    if not universe_snapshot_shared():
+        return None
+    path = snapshot_path(tick)
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_pickle(path)
+    except Exception as e:
+        logging.error(f"Could not read universe snapshot '{path}': {e}")
+        return None
+
+
+def get_universe_snapshot(finviz_email, now=None):
+    """
+    Return the shared Finviz universe for the current tick.
+    Looks in process memory first, then on disk, and only downloads when
+    neither holds the current tick. Callers get their own copy to mutate.
+    Returns:
+        pd.DataFrame: The typed universe export, or None if it is unavailable.
+    """
+    with _snapshot_lock:
+        df = _load_universe_snapshot(finviz_email, current_tick(now))
+        return None if df is None else df.copy()
+
+
+def _load_universe_snapshot(finviz_email, tick):
+    """The process-wide snapshot of tick, loaded or downloaded if needed"""
+    if _snapshot["tick"] != tick or _snapshot["df"] is None:
+        downloaded = False
+        df = read_snapshot(tick)
+        if df is None:
+            df = download_universe(finviz_email)
+            if df.empty:
+                return None
+            downloaded = True
+            try:
+                write_snapshot(df, tick)
+            except OSError as e:
+                logging.error(f"Could not store universe snapshot: {e}")
+        _snapshot["tick"] = tick
+        _snapshot["df"] = df
+        _snapshot["typed"] = None
+        _snapshot["downloaded"] = downloaded
+
+    return _snapshot["df"]
+
+
+def get_typed_universe_snapshot(finviz_email, process_columns, now=None):
+    """
+    Return (raw, typed) frames of the current universe.
+    The typed frame is converted once per tick with process_columns and is
+    shared between scanners, so it must be treated as read-only.
+    """
+    with _snapshot_lock:
+        raw = get_universe_snapshot(finviz_email, now)
+        if raw is None:
+            return None, None
+        if _snapshot["typed"] is None:
+            _snapshot["typed"] = process_columns(raw.copy())
+            # Only the process that downloaded the tick archives it
+            if _snapshot["downloaded"]:
+                archive_snapshot(_snapshot["typed"], "universe")
+        return raw, _snapshot["typed"]
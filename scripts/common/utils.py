@@ -1,25 +1,101 @@
+import csv
+import gzip
+import hashlib
+import json
 import logging
+import math
 import os
+import tempfile
+import threading
 import time
-from io import BytesIO
+from io import BytesIO, StringIO
 
+import numpy as np
 import pandas as pd
 import psycopg2
 import requests
 from dotenv import load_dotenv
-from psycopg2 import OperationalError, extras
+from psycopg2 import OperationalError, errorcodes, extras
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Set up logging
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 
+# (connect, read) timeouts in seconds for every outgoing HTTP request
+HTTP_TIMEOUT = (
+    float(os.getenv("HTTP_CONNECT_TIMEOUT") or 5),
+    float(os.getenv("HTTP_READ_TIMEOUT") or 60),
+)
+
+# Module level so the pool stays open across warm Cloud Function invocations
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+class ServerErrorRetry(Retry):
+    """
+    Retries 5xx answers only. 429s are returned to the caller, which knows
+    the rate limit (see common.discord), instead of being slept on inside
+    the connection pool.
+    """
+
+    RETRY_AFTER_STATUS_CODES = frozenset([503])
+
+
+def get_http_session():
+    """
+    Return the shared requests.Session used for Finviz and Discord.
+    Connections are kept alive and pooled, responses may be gzip compressed,
+    and failed connections are retried with exponential backoff. 5xx answers
+    and read timeouts are only retried for GETs: a POST such as a Discord
+    webhook may have been processed anyway, and sending it again would post
+    it twice.
+    """
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            retry = ServerErrorRetry(
+                total=4,
+                connect=4,
+                read=2,
+                status=4,
+                backoff_factor=0.5,
+                status_forcelist=(500, 502, 503, 504),
+                allowed_methods=frozenset(["GET"]),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(
+                {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"}
+            )
+            _http_session = session
+    return _http_session
+
+
+def http_get(url, **kwargs):
+    """GET through the shared session with the default timeouts"""
+    kwargs.setdefault("timeout", HTTP_TIMEOUT)
+    return get_http_session().get(url, **kwargs)
+
+
+def http_post(url, **kwargs):
+    """POST through the shared session with the default timeouts"""
+    kwargs.setdefault("timeout", HTTP_TIMEOUT)
+    return get_http_session().post(url, **kwargs)
+
 
 def fetch_api_data(url):
     """Fetch data from API."""
     try:
         logging.info(url)
-        response = requests.get(url)
+        response = http_get(url)
         if response.status_code == 200:
             return response.json()
     except Exception as e:
@@ -27,27 +103,68 @@ def fetch_api_data(url):
     return None
 
 
+def connect_database():
+    """Open a connection from the DB_* settings, None if that fails"""
+    try:
+        return psycopg2.connect(
+            dbname=os.getenv("DB_NAME"),
+            user=os.getenv("DB_USER"),
+            password=os.getenv("DB_PWD"),
+            host=os.getenv("DB_HOST"),
+            port="5432",
+        )
+    except OperationalError as e:
+        print(e)
+        logging.error(f"The error '{e}' occurred")
+        return None
+
+
 class DBConnection:
     def __enter__(self):
-        try:
-            self.connection = psycopg2.connect(
-                dbname=os.getenv("DB_NAME"),
-                user=os.getenv("DB_USER"),
-                password=os.getenv("DB_PWD"),
-                host=os.getenv("DB_HOST"),
-                port="5432",
-            )
-            return self.connection
-        except OperationalError as e:
-            print(e)
-            logging.error(f"The error '{e}' occurred")
-            return None
+        self.connection = connect_database()
+        return self.connection
 
     def __exit__(self, exc_type, exc_value, traceback):
         if self.connection:
             self.connection.close()
 
 
+class SharedDBConnection:
+    """
+    One connection shared by the scanners of a process. Calling it stands
+    in for DBConnection(): every `with` block gets the connection to itself
+    until it exits, so transactions of different threads never interleave.
+    The connection stays open between blocks and is reopened if it broke.
+    """
+
+    def __init__(self):
+        self.connection = None
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        return self
+
+    def __enter__(self):
+        self.lock.acquire()
+        if self.connection is None or self.connection.closed:
+            self.connection = connect_database()
+        return self.connection
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if self.connection and not self.connection.closed:
+                # Leave no transaction open for the next block
+                self.connection.rollback()
+        finally:
+            self.lock.release()
+
+    def close(self):
+        with self.lock:
+            if self.connection and not self.connection.closed:
+                self.connection.close()
+            self.connection = None
+
+
 def execute_select_query(cursor, query, values=None):
     """
     Execute a SELECT query using the given cursor, query, and optional values.
@@ -128,7 +245,9 @@ def chunk_list(data_list, chunk_size):
         yield data_list[i : i + chunk_size]  # noqa
 
 
-def execute_bulk_insert(connection, cursor, query, values, page_size=1000):
+def execute_bulk_insert(
+    connection, cursor, query, values, page_size=1000, commit=True, fetch=False
+):
     """
     Execute a bulk insert operation using psycopg2's execute_values method.
 
@@ -137,12 +256,206 @@ def execute_bulk_insert(connection, cursor, query, values, page_size=1000):
     :param query: The SQL insert query string.
     :param values: A list of tuples containing the data to be inserted.
     :param page_size: The number of records to insert in each batch (default 1000).
+    :param commit: Commit right away, False leaves it to the caller's transaction.
+    :param fetch: Return the rows of the query's RETURNING clause, from all pages.
     """
     # Execute the query using execute_values
-    extras.execute_values(cursor, query, values, page_size=page_size)
+    rows = extras.execute_values(
+        cursor, query, values, page_size=page_size, fetch=fetch
+    )
 
     # Commit the changes
-    connection.commit()
+    if commit:
+        connection.commit()
+    return rows
+
+
+def column_values(column):
+    """The values of a Series as Python objects, missing values as None"""
+    return column.to_numpy(dtype=object, na_value=None)
+
+
+def integer_values(column):
+    """
+    The values of a numeric Series rounded to Python ints for integer
+    columns, missing values as None. Rounds half away from zero like
+    Postgres casts numeric to bigint, so COPY, which does not cast, stores
+    what an INSERT of the unrounded value would.
+    """
+    numbers = pd.to_numeric(column, errors="coerce").astype("float64")
+    rounded = np.sign(numbers) * np.floor(np.abs(numbers) + 0.5)
+    return column_values(rounded.astype("Int64"))
+
+
+# NULL marker of the COPY staging files. Unquoted, so it cannot be
+# mistaken for an empty string, which the csv module writes as nothing.
+COPY_NULL = "\\N"
+
+
+def write_copy_csv(values):
+    """Write rows as COPY CSV text, with None as COPY_NULL"""
+    buffer = StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for row in values:
+        writer.writerow([COPY_NULL if value is None else value for value in row])
+    buffer.seek(0)
+    return buffer
+
+
+def execute_copy_upsert(
+    connection, cursor, table, columns, conflict, values, commit=True, fetch=False
+):
+    """
+    Stream rows into a temporary staging table with COPY FROM STDIN and
+    merge them into `table` with a single INSERT ... SELECT. Unlike
+    execute_bulk_insert, no statement text grows with the number of rows.
+
+    :param table: The target table.
+    :param columns: The target columns, in the order of the value tuples.
+    :param conflict: The ON CONFLICT clause of the merge, and any RETURNING.
+    :param values: A list of tuples containing the data to be upserted.
+    :param commit: Commit right away, False leaves it to the caller's transaction.
+    :param fetch: Return the rows of the RETURNING clause.
+    """
+    staging = f"{table}_staging"
+    column_list = ", ".join(columns)
+    # The staging table copies the column types of the target and is
+    # dropped at the end of the transaction
+    cursor.execute(
+        f"""
+        CREATE TEMP TABLE IF NOT EXISTS {staging} ON COMMIT DROP AS
+        SELECT {column_list} FROM {table} WITH NO DATA
+        """
+    )
+    cursor.execute(f"TRUNCATE {staging}")
+    cursor.copy_expert(
+        f"COPY {staging} ({column_list}) FROM STDIN "
+        f"WITH (FORMAT csv, NULL '{COPY_NULL}')",
+        write_copy_csv(values),
+    )
+    cursor.execute(
+        f"""
+        INSERT INTO {table} ({column_list})
+        SELECT {column_list} FROM {staging}
+        {conflict}
+        """
+    )
+    rows = cursor.fetchall() if fetch else None
+
+    if commit:
+        connection.commit()
+    return rows
+
+
+# Failures that can succeed when the statement is simply run again
+RETRYABLE_PGCODES = frozenset(
+    [
+        errorcodes.SERIALIZATION_FAILURE,
+        errorcodes.DEADLOCK_DETECTED,
+        errorcodes.LOCK_NOT_AVAILABLE,
+        errorcodes.QUERY_CANCELED,
+    ]
+)
+# Attempts of one unit of work step after a retryable failure
+UNIT_OF_WORK_RETRIES = int(os.getenv("UNIT_OF_WORK_RETRIES") or 2)
+
+
+class UnitOfWork:
+    """
+    Collects the writes of a run and executes them in one transaction
+    with a single commit. Every step runs under its own savepoint, so a
+    failed step is rolled back alone: retryable failures (deadlocks,
+    serialization failures, lock and statement timeouts) are retried, a
+    failed non-critical step is skipped and a failed critical step rolls
+    back the whole transaction. Constraints are checked IMMEDIATE, so a
+    step whose rows violate a foreign key fails on its own.
+    When every step is non-critical the commit does not wait for the WAL
+    flush (SET LOCAL synchronous_commit = off): a crash right after it can
+    lose the transaction, but never corrupts data.
+
+        work = UnitOfWork()
+        work.add(bulk_upsert_stock_info, rows, critical=False)
+        work.add(bulk_upsert_alerts, alerts)
+        work.commit()
+    """
+
+    def __init__(
+        self, connection=None, retries=UNIT_OF_WORK_RETRIES, connect=DBConnection
+    ):
+        # Opens a connection with connect() in commit() when None
+        self.connection = connection
+        self.connect = connect
+        self.retries = retries
+        self.steps = []
+        # (function name, return value) of every step that ran
+        self.results = []
+
+    def add(self, function, *args, critical=True, **kwargs):
+        """
+        Queue function(connection, cursor, *args, commit=False, **kwargs),
+        the signature of execute_bulk_insert and the bulk upserts.
+        """
+        self.steps.append((function, args, kwargs, critical))
+
+    def commit(self):
+        """
+        Run the queued steps and commit them.
+        Returns:
+            list: The names of the non-critical steps that were skipped.
+        """
+        steps, self.steps = self.steps, []
+        self.results = []
+        if not steps:
+            return []
+        if self.connection is not None:
+            return self._run(self.connection, steps)
+        with self.connect() as connection:
+            if connection is None:
+                raise OperationalError("Could not connect to the database")
+            return self._run(connection, steps)
+
+    def _run(self, connection, steps):
+        skipped = []
+        try:
+            with connection.cursor() as cursor:
+                # Deferred foreign keys would only fail at COMMIT and take every
+                # step down with them, checked right away they fail their step
+                cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+                if not any(critical for _, _, _, critical in steps):
+                    cursor.execute("SET LOCAL synchronous_commit = off")
+                for number, (function, args, kwargs, critical) in enumerate(steps):
+                    try:
+                        result = self._run_step(
+                            cursor, f"step_{number}", function, args, kwargs
+                        )
+                        self.results.append((function.__name__, result))
+                    except psycopg2.Error as e:
+                        if critical:
+                            raise
+                        logging.error(f"Skipped {function.__name__}: {e}")
+                        skipped.append(function.__name__)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        return skipped
+
+    def _run_step(self, cursor, savepoint, function, args, kwargs):
+        """Run one step under a savepoint, retrying retryable failures"""
+        for attempt in range(self.retries + 1):
+            cursor.execute(f"SAVEPOINT {savepoint}")
+            try:
+                result = function(
+                    cursor.connection, cursor, *args, commit=False, **kwargs
+                )
+            except psycopg2.Error as e:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+                if e.pgcode not in RETRYABLE_PGCODES or attempt == self.retries:
+                    raise
+                print(f"Retrying {function.__name__}: {e.pgerror}")
+            else:
+                cursor.execute(f"RELEASE SAVEPOINT {savepoint}")
+                return result
 
 
 def execute_direct_query(connection, cursor, query):
@@ -186,16 +499,236 @@ def convert_to_float(value):
     return None
 
 
-def fetch_csv_as_dataframe(url, params):
-    try:
-        # Fetch the data from the URL
-        response = requests.get(url, params=params)
-        response.raise_for_status()  # Ensure we got a valid response
+def to_json(data):
+    """
+    Serialize data for a jsonb column. NaN, infinities and missing values
+    (None, pd.NA) become null, since Postgres rejects NaN in JSON.
+    """
+
+    def clean(value):
+        if isinstance(value, dict):
+            return {key: clean(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [clean(item) for item in value]
+        if isinstance(value, np.generic):
+            value = value.item()
+        if value is pd.NA or value is pd.NaT:
+            return None
+        if isinstance(value, float) and not math.isfinite(value):
+            return None
+        return value
+
+    return json.dumps(clean(data))
+
+
+class ExportCache:
+    """
+    On-disk TTL cache for CSV exports, keyed on the request parameters.
+    Each entry keeps the gzip compressed response body plus parsed DataFrame
+    copies (one per column projection), so a hit skips both the download
+    and the CSV parse. Entries expire `ttl` seconds after the download and
+    the least recently used ones are evicted above `max_bytes`.
+    """
+
+    def __init__(self, directory, ttl, max_bytes):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._private = None
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.private()
+
+    def private(self):
+        """
+        Create the directory readable by this user only, and refuse to use
+        one that another user owns or can write to: its pickles are loaded
+        as they are.
+        """
+        if self._private is None:
+            try:
+                os.makedirs(self.directory, mode=0o700, exist_ok=True)
+                stat = os.stat(self.directory)
+                owned = not hasattr(os, "getuid") or stat.st_uid == os.getuid()
+                self._private = owned and not stat.st_mode & 0o022
+            except OSError as e:
+                logging.error(f"Export cache directory error: '{e}'")
+                self._private = False
+            if not self._private:
+                logging.error(f"Export cache disabled, '{self.directory}' is not private")
+        return self._private
+
+    def key(self, url, params):
+        # Credentials never become part of the key
+        normalized = {
+            key: str(value) for key, value in (params or {}).items() if key != "auth"
+        }
+        payload = json.dumps([url, normalized], sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, f"{key}{suffix}")
+
+    def _frame_suffix(self, usecols, parser=None):
+        if usecols is None and parser is None:
+            return ".pkl"
+        columns = json.dumps([sorted(usecols) if usecols is not None else None, parser])
+        return f"-{hashlib.sha256(columns.encode()).hexdigest()[:16]}.pkl"
+
+    def _fresh(self, key):
+        """Return True when the entry exists and is younger than the TTL"""
+        try:
+            created = os.stat(self._path(key, ".csv.gz")).st_mtime
+        except OSError:
+            return False
+        return time.time() - created < self.ttl
+
+    def _touch(self, path):
+        # atime records the last use for LRU eviction, mtime keeps the download time
+        stat = os.stat(path)
+        os.utime(path, (time.time(), stat.st_mtime))
+
+    def _write(self, path, write):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get_content(self, key):
+        if not self.enabled or not self._fresh(key):
+            return None
+        path = self._path(key, ".csv.gz")
+        try:
+            with gzip.open(path, "rb") as cached_file:
+                content = cached_file.read()
+            self._touch(path)
+            return content
+        except OSError as e:
+            logging.error(f"Export cache read error: '{e}'")
+            return None
+
+    def put_content(self, key, content):
+        if not self.enabled:
+            return
+
+        def write(tmp_path):
+            with gzip.open(tmp_path, "wb", compresslevel=5) as cached_file:
+                cached_file.write(content)
+
+        try:
+            self._write(self._path(key, ".csv.gz"), write)
+            # Parsed copies of an older download are stale now
+            for name in os.listdir(self.directory):
+                if name.startswith(key) and name.endswith(".pkl"):
+                    os.remove(os.path.join(self.directory, name))
+            self.evict()
+        except OSError as e:
+            logging.error(f"Export cache write error: '{e}'")
+
+    def get_frame(self, key, usecols=None, parser=None):
+        if not self.enabled or not self._fresh(key):
+            return None
+        path = self._path(key, self._frame_suffix(usecols, parser))
+        if not os.path.exists(path):
+            return None
+        try:
+            df = pd.read_pickle(path)
+            self._touch(path)
+            self._touch(self._path(key, ".csv.gz"))
+            return df
+        except Exception as e:
+            logging.error(f"Export cache read error: '{e}'")
+            return None
 
-        # Load the data into a DataFrame
-        df = pd.read_csv(BytesIO(response.content))
+    def put_frame(self, key, df, usecols=None, parser=None):
+        if not self.enabled:
+            return
+        try:
+            self._write(self._path(key, self._frame_suffix(usecols, parser)), df.to_pickle)
+            self.evict()
+        except OSError as e:
+            logging.error(f"Export cache write error: '{e}'")
+
+    def evict(self):
+        """Drop expired entries, then least recently used files above max_bytes"""
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if name.endswith(".tmp"):
+                continue
+            if time.time() - stat.st_mtime >= self.ttl:
+                self._remove(path)
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # Another process evicted it first
+            pass
+
+
+# Off unless FINVIZ_CACHE_TTL is set
+export_cache = ExportCache(
+    directory=os.getenv("FINVIZ_CACHE_DIR")
+    or os.path.join(
+        tempfile.gettempdir(),
+        f"finviz_cache_{os.getuid()}" if hasattr(os, "getuid") else "finviz_cache",
+    ),
+    ttl=float(os.getenv("FINVIZ_CACHE_TTL") or 0),
+    max_bytes=int(os.getenv("FINVIZ_CACHE_MAX_BYTES") or 256 * 1024 * 1024),
+)
+
+
+def fetch_csv_as_dataframe(url, params, usecols=None, parser=None):
+    """
+    Download a CSV export into a DataFrame.
+    By default it is read with pd.read_csv and missing cells become 0.
+    `parser(content, usecols)` replaces that, e.g. with a typed reader.
+    """
+    parser_name = parser.__name__ if parser is not None else None
+    cache_key = export_cache.key(url, params)
+    df = export_cache.get_frame(cache_key, usecols, parser_name)
+    if df is not None:
+        return df
+
+    try:
+        content = export_cache.get_content(cache_key)
+        if content is None:
+            # Fetch the data from the URL
+            response = http_get(url, params=params)
+            response.raise_for_status()  # Ensure we got a valid response
+            content = response.content
+            export_cache.put_content(cache_key, content)
+
+        # Load the data into a DataFrame, parsing only the wanted columns
+        if parser is not None:
+            df = parser(content, usecols)
+        elif usecols is not None:
+            wanted = set(usecols)
+            df = pd.read_csv(BytesIO(content), usecols=lambda col: col in wanted)
+            df = df.fillna(0)
+        else:
+            df = pd.read_csv(BytesIO(content)).fillna(0)
 
-        df = df.fillna(0)
+        export_cache.put_frame(cache_key, df, usecols, parser_name)
 
         return df
     except requests.exceptions.RequestException:
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The scanners import their helpers as `common.*`, the way the deployed
+# functions and `PYTHONPATH=scripts` runs see them
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
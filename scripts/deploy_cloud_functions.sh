@@ -22,7 +22,7 @@ deploy_function() {
         --runtime python311 \
         --trigger-http \
         --allow-unauthenticated \
-        --set-env-vars DB_HOST=${DB_HOST},DB_PWD=${DB_PWD},DB_USER=${DB_USER},DB_NAME=${DB_NAME},FINVIZ_EMAIL=${FINVIZ_EMAIL} \
+        --set-env-vars DB_HOST=${DB_HOST},DB_PWD=${DB_PWD},DB_USER=${DB_USER},DB_NAME=${DB_NAME},FINVIZ_EMAIL=${FINVIZ_EMAIL},UNIVERSE_SNAPSHOT_DIR=${UNIVERSE_SNAPSHOT_DIR},SNAPSHOT_ARCHIVE_DIR=${SNAPSHOT_ARCHIVE_DIR},DISCORD_DELIVERY=${DISCORD_DELIVERY} \
         --entry-point=main \
         --memory=4GiB \
         --cpu=2 \
@@ -105,3 +105,23 @@ if git diff --name-only $GITHUB_BEFORE $GITHUB_SHA | grep -q 'scripts/7_CNBC_gro
     deploy_function "CNBC_growth_scanner_bot_function" "scripts/7_CNBC_growth_scanner_bot" "no-gen2" "35 16 * * MON-FRI" '{"source":"cnbc"}'
 fi
 
+if git diff --name-only $GITHUB_BEFORE $GITHUB_SHA | grep -q 'scripts/8_discord_outbox_worker/'; then
+    # Only scheduled when the scanners write to the outbox, otherwise it has nothing to send
+    if [ "$DISCORD_DELIVERY" = "outbox" ]; then
+        deploy_function "discord_outbox_worker_function" "scripts/8_discord_outbox_worker" "no-gen2" "* * * * *" '{"source":"outbox"}'
+    else
+        deploy_function "discord_outbox_worker_function" "scripts/8_discord_outbox_worker" "no-gen2"
+    fi
+fi
+
+# Runs the scanners in one process, invoked on demand (no schedule) so
+# switching from the per-bot functions is deliberate and alerts never go out twice
+if git diff --name-only $GITHUB_BEFORE $GITHUB_SHA | grep -qE 'scripts/(0_scanner_orchestrator|[1-7]_[^/]+)/'; then
+    # load_scanner_classes finds the bots next to common/
+    for bot_dir in scripts/[1-7]_*/; do
+        mkdir -p scripts/0_scanner_orchestrator/$(basename $bot_dir)
+        cp $bot_dir/main.py scripts/0_scanner_orchestrator/$(basename $bot_dir)/
+    done
+    deploy_function "scanner_orchestrator_function" "scripts/0_scanner_orchestrator" "no-gen2"
+    rm -rf scripts/0_scanner_orchestrator/[1-7]_*/
+fi
@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from common.buckets import (
+    BILLION,
+    assign_buckets,
+    bucket_edges,
+    group_by_bucket,
+    group_by_market_cap,
+    label_by_market_cap,
+    market_cap_billions,
+)
+
+BUCKETS = {"low": (0, 10), "mid": (10, 20), "high": (20, float("inf"))}
+
+
+def stocks():
+    # Market Cap in millions, like the Finviz export
+    return pd.DataFrame(
+        {
+            "Ticker": ["AAA", "BBB", "CCC", "DDD", "EEE"],
+            "Market Cap": [15000.0, 500.0, np.nan, 3000.0, 800.0],
+        }
+    )
+
+
+class AssignBucketsTest(unittest.TestCase):
+    def test_edges_are_half_open(self):
+        positions = assign_buckets([0, 9.9, 10, 20, 1e9], BUCKETS)
+        self.assertEqual(list(positions), [0, 0, 1, 2, 2])
+
+    def test_outside_and_missing(self):
+        positions = assign_buckets([-1, np.nan], BUCKETS)
+        self.assertEqual(list(positions), [-1, -1])
+
+    def test_unit(self):
+        self.assertEqual(list(assign_buckets([0.5, 1.5], BUCKETS, unit=10)), [0, 1])
+
+    def test_ranges_must_be_contiguous_and_increasing(self):
+        with self.assertRaises(ValueError):
+            bucket_edges({"a": (0, 10), "b": (11, 20)})
+        with self.assertRaises(ValueError):
+            bucket_edges({"a": (10, 5)})
+
+
+class GroupByBucketTest(unittest.TestCase):
+    def test_frames_per_bucket_keep_row_order(self):
+        df = pd.DataFrame({"Ticker": list("abcde"), "Value": [25, 1, 12, 3, np.nan]})
+        grouped = group_by_bucket(df, "Value", BUCKETS)
+        self.assertEqual(list(grouped), ["low", "mid", "high"])
+        self.assertEqual(list(grouped["low"]["Ticker"]), ["b", "d"])
+        self.assertEqual(list(grouped["mid"]["Ticker"]), ["c"])
+        self.assertEqual(list(grouped["high"]["Ticker"]), ["a"])
+
+    def test_empty_buckets_are_empty_frames(self):
+        df = pd.DataFrame({"Value": [1.0]})
+        grouped = group_by_bucket(df, "Value", BUCKETS)
+        self.assertTrue(grouped["high"].empty)
+        self.assertEqual(list(grouped["high"].columns), ["Value"])
+
+    def test_market_cap_in_millions(self):
+        grouped = group_by_market_cap(stocks())
+        self.assertEqual(list(grouped["Small Cap"]["Ticker"]), ["BBB", "EEE"])
+        self.assertEqual(list(grouped["Mid Cap"]["Ticker"]), ["DDD"])
+        self.assertEqual(list(grouped["Large Cap"]["Ticker"]), ["AAA"])
+
+    def test_labels(self):
+        labels = label_by_market_cap(stocks())
+        self.assertEqual(
+            list(labels), ["Large Cap", "Small Cap", None, "Mid Cap", "Small Cap"]
+        )
+
+    def test_billions(self):
+        self.assertEqual(market_cap_billions(2500.0), 2500.0 * 1e6 / BILLION)
+
+
+if __name__ == "__main__":
+    unittest.main()
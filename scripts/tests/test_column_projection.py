@@ -0,0 +1,69 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from common.columns import (
+    FINVIZ_COLUMN_IDS,
+    add_missing_columns,
+    export_column_ids,
+)
+from common.scanners import load_scanner_classes
+from common.universe import FINVIZ_ALL_COLUMNS
+
+ALL_IDS = {int(num) for num in FINVIZ_ALL_COLUMNS.split(",")}
+
+
+class ExportColumnIdsTest(unittest.TestCase):
+    def test_known_ids_sorted(self):
+        self.assertEqual(export_column_ids(["Price", "Ticker", "Volume"]), "1,65,67")
+
+    def test_unknown_columns_are_skipped(self):
+        self.assertEqual(export_column_ids(["Ticker", "Exchange"]), "1")
+        self.assertIsNone(export_column_ids(["Exchange"]))
+
+
+class AddMissingColumnsTest(unittest.TestCase):
+    def test_missing_values_by_type(self):
+        df = pd.DataFrame({"Ticker": ["AAA", "BBB"]})
+        df = add_missing_columns(df, ["Ticker", "Exchange", "Price", "Volume"])
+        self.assertEqual(list(df["Exchange"]), ["N/A", "N/A"])
+        self.assertIsInstance(df["Exchange"].dtype, pd.CategoricalDtype)
+        self.assertTrue(np.isnan(df["Price"]).all())
+        self.assertEqual(str(df["Volume"].dtype), "Int64")
+        self.assertTrue(df["Volume"].isna().all())
+
+    def test_present_columns_untouched(self):
+        df = pd.DataFrame({"Ticker": ["AAA"], "Price": [1.5]})
+        self.assertIs(add_missing_columns(df, ["Ticker", "Price"]), df)
+
+
+class ScannerProjectionTest(unittest.TestCase):
+    def test_every_scanner_requests_a_strict_subset(self):
+        for scanner_class in load_scanner_classes():
+            with self.subTest(scanner=scanner_class.__name__):
+                scanner = scanner_class()
+                requests = []
+
+                def fetch(url, params, usecols=None, parser=None):
+                    requests.append(dict(params))
+                    known = [col for col in usecols if col in FINVIZ_COLUMN_IDS]
+                    return pd.DataFrame({col: [1.0] for col in known}).assign(
+                        Ticker=["AAA"]
+                    )
+
+                with mock.patch("common.base_scanner.fetch_csv_as_dataframe", fetch):
+                    with mock.patch("common.base_scanner.build_and_print_url"):
+                        df = scanner.download_finviz_export(
+                            "", scanner.required_columns()
+                        )
+
+                self.assertEqual(len(requests), 1)
+                ids = {int(num) for num in requests[0]["c"].split(",")}
+                self.assertLess(ids, ALL_IDS)
+                self.assertEqual(list(df["Exchange"]), ["N/A"])
+
+
+if __name__ == "__main__":
+    unittest.main()
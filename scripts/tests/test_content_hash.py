@@ -0,0 +1,76 @@
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from common import extra_utils
+from common.extra_utils import (
+    bulk_upsert_stock_info,
+    bulk_upsert_stocks,
+    content_hash,
+    count_upserted,
+    with_content_hash,
+)
+
+EARLIER = datetime(2025, 3, 10, 9, 30)
+LATER = datetime(2025, 3, 10, 9, 40)
+
+
+class ContentHashTest(unittest.TestCase):
+    def test_same_values_same_hash(self):
+        self.assertEqual(content_hash(["AAA", 1.5, None]), content_hash(["AAA", 1.5, None]))
+
+    def test_any_changed_value_changes_the_hash(self):
+        base = content_hash(["AAA", "Apple", "NASDAQ"])
+        self.assertNotEqual(base, content_hash(["AAA", "Apple", "NYSE"]))
+        # Values are separated, so they cannot run into each other
+        self.assertNotEqual(content_hash(["ab", "c"]), content_hash(["a", "bc"]))
+
+    def test_timestamps_are_not_hashed(self):
+        first, second = with_content_hash(
+            [("AAA", 1.5, 100, EARLIER), ("AAA", 1.5, 100, LATER)], 3
+        )
+        self.assertEqual(first[:4], ("AAA", 1.5, 100, EARLIER))
+        self.assertEqual(first[-1], second[-1])
+
+    def test_counts(self):
+        counts = count_upserted([(True,), (False,), (True,)], 5)
+        self.assertEqual(counts, {"inserted": 2, "changed": 1, "skipped": 2})
+
+
+class ContentHashUpsertTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(extra_utils, "upsert", return_value=[(True,)])
+        self.upsert = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def upserted(self):
+        (_, _, table, columns, conflict, rows, *_), kwargs = self.upsert.call_args
+        self.assertTrue(kwargs["fetch"])
+        return table, columns, conflict, rows
+
+    def test_unchanged_stocks_are_skipped(self):
+        stocks = [
+            ("AAA", "A Inc", "NASDAQ", "Tech", "Software", EARLIER, EARLIER),
+            ("BBB", "B Corp", "NYSE", "Energy", "Oil", EARLIER, EARLIER),
+        ]
+        counts = bulk_upsert_stocks(None, None, stocks, commit=False)
+        self.assertEqual(counts, {"inserted": 1, "changed": 0, "skipped": 1})
+
+        table, columns, conflict, rows = self.upserted()
+        self.assertEqual(columns[-1], "content_hash")
+        self.assertIn(
+            "WHERE stocks_stock.content_hash IS DISTINCT FROM EXCLUDED.content_hash",
+            conflict,
+        )
+        self.assertEqual(rows[0][-1], content_hash(stocks[0][:5]))
+
+    def test_stock_info_hash_ignores_updated_at(self):
+        info = [("AAA", 1e9, 1000, 1.5, 2000, EARLIER)]
+        bulk_upsert_stock_info(None, None, info, commit=False)
+        first = self.upserted()[3][0][-1]
+        bulk_upsert_stock_info(None, None, [info[0][:5] + (LATER,)], commit=False)
+        self.assertEqual(self.upserted()[3][0][-1], first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import csv
+import unittest
+
+import pandas as pd
+
+from common.base_scanner import BaseScanner
+from common.utils import COPY_NULL, integer_values, write_copy_csv
+
+
+def typed_stocks():
+    return pd.DataFrame(
+        {
+            "Ticker": ["AAA", "BBB", "CCC"],
+            "Company": ["A Inc", "B, Corp", None],
+            "Exchange": pd.Categorical(["NASD", "NYSE", "NASD"]),
+            "Sector": ["Technology", "Energy", "Utilities"],
+            "Industry": ["Software", "Oil", "Power"],
+            "Market Cap": [1.5e9, 250.25e6, None],
+            "Average Volume": [714.67, 1200.5, None],
+            "Price": [10.5, 3.25, 7.0],
+            "Change": [0.012, -0.3, None],
+            "Volume": pd.array([1500, None, 42], dtype="Int64"),
+            "Relative Volume": [1.25, 0.5, None],
+        }
+    )
+
+
+def read_rows(buffer):
+    return list(csv.reader(buffer))
+
+
+class IntegerValuesTest(unittest.TestCase):
+    def test_rounds_half_away_from_zero(self):
+        column = pd.Series([714.67, 2.5, -2.5, 0.4, None])
+        self.assertEqual(list(integer_values(column)), [715, 3, -3, 0, None])
+
+    def test_keeps_nullable_integers(self):
+        column = pd.Series(pd.array([3, None], dtype="Int64"))
+        values = list(integer_values(column))
+        self.assertEqual(values, [3, None])
+        self.assertIs(type(values[0]), int)
+
+
+class WriteCopyCsvTest(unittest.TestCase):
+    def setUp(self):
+        self.scanner = BaseScanner("webhook")
+        self.df = typed_stocks()
+
+    def test_stock_info_integer_columns(self):
+        _, stock_info = self.scanner.prepare_base_records(self.df)
+        rows = read_rows(write_copy_csv(stock_info))
+        # stock_id, market_cap, avg_volume, current_price, current_volume, updated_at
+        self.assertEqual(rows[0], ["AAA", "1500000000.0", "715", "10.5", "1500", "NOW()"])
+        self.assertEqual(rows[1][2:5], ["1201", "3.25", COPY_NULL])
+        self.assertEqual(rows[2][1:3], [COPY_NULL, COPY_NULL])
+
+    def test_stock_text_columns(self):
+        stocks, _ = self.scanner.prepare_base_records(self.df)
+        rows = read_rows(write_copy_csv(stocks))
+        self.assertEqual(rows[1][:3], ["BBB", "B, Corp", "NYSE"])
+        self.assertEqual(rows[2][1], COPY_NULL)
+
+    def test_quote_volume(self):
+        quotes = self.scanner.prepare_quote_records(self.df)
+        rows = read_rows(write_copy_csv(quotes))
+        # stock_id, ts, price, change, volume, rel_volume, market_cap
+        self.assertEqual([row[4] for row in rows], ["1500", COPY_NULL, "42"])
+        self.assertEqual(rows[2][3], COPY_NULL)
+
+
+if __name__ == "__main__":
+    unittest.main()
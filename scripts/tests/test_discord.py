@@ -0,0 +1,153 @@
+import unittest
+from unittest import mock
+
+import requests
+
+from common import base_scanner
+from common.base_scanner import BaseScanner
+from common.discord import (
+    MAX_EMBEDS_PER_MESSAGE,
+    MAX_MESSAGE_CHARACTERS,
+    UNKNOWN_LIMIT_POLL,
+    WebhookRateLimit,
+    embed_length,
+    pack_embeds,
+)
+
+
+def embed(characters):
+    return {"title": "x" * characters}
+
+
+class PackEmbedsTest(unittest.TestCase):
+    def test_counts_every_text_part(self):
+        item = {
+            "title": "ab",
+            "description": "cde",
+            "footer": {"text": "f"},
+            "author": {"name": "gh"},
+            "fields": [{"name": "i", "value": "jk"}, {"name": "", "value": "l"}],
+        }
+        self.assertEqual(embed_length(item), 12)
+
+    def test_at_most_ten_embeds_per_message(self):
+        batches = pack_embeds([embed(1) for _ in range(25)])
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+        self.assertEqual(MAX_EMBEDS_PER_MESSAGE, 10)
+
+    def test_at_most_6000_characters_per_message(self):
+        embeds = [embed(2500), embed(2500), embed(1000), embed(1)]
+        batches = pack_embeds(embeds)
+        self.assertEqual([len(batch) for batch in batches], [3, 1])
+        for batch in batches:
+            self.assertLessEqual(
+                sum(map(embed_length, batch)), MAX_MESSAGE_CHARACTERS
+            )
+
+    def test_order_is_kept(self):
+        embeds = [{"title": str(i) * 3000} for i in range(5)]
+        flat = [item for batch in pack_embeds(embeds) for item in batch]
+        self.assertEqual(flat, embeds)
+
+    def test_oversized_embed_gets_its_own_message(self):
+        batches = pack_embeds([embed(1), embed(7000), embed(1)])
+        self.assertEqual([len(batch) for batch in batches], [1, 1, 1])
+
+    def test_no_embeds(self):
+        self.assertEqual(pack_embeds([]), [])
+
+
+class SyncFlushTest(unittest.TestCase):
+    def setUp(self):
+        self.scanner = BaseScanner("webhook")
+        self.scanner.delivery = "sync"
+        patcher = mock.patch.object(base_scanner, "post_webhook")
+        self.post_webhook = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_a_failed_message_does_not_drop_the_rest(self):
+        self.post_webhook.side_effect = [
+            requests.exceptions.ConnectionError("reset"),
+            mock.Mock(ok=True),
+            mock.Mock(ok=True),
+        ]
+        for _ in range(25):
+            self.scanner.send_discord_message(embed(1))
+        with self.assertLogs(level="ERROR"):
+            self.scanner.flush_discord_messages()
+        self.assertEqual(self.post_webhook.call_count, 3)
+        self.assertEqual(self.scanner.pending_embeds, [])
+
+
+def response(status=204, limit=5, remaining=None, reset_after=2.0, retry_after=None):
+    headers = {"X-RateLimit-Limit": str(limit), "X-RateLimit-Reset-After": str(reset_after)}
+    if remaining is not None:
+        headers["X-RateLimit-Remaining"] = str(remaining)
+    if retry_after is not None:
+        headers["Retry-After"] = str(retry_after)
+    return mock.Mock(status_code=status, headers=headers)
+
+
+class WebhookRateLimitTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 100.0
+        self.bucket = WebhookRateLimit(clock=lambda: self.now)
+
+    def reserve_all(self):
+        """Reserve until the bucket makes us wait, return the count"""
+        count = 0
+        while self.bucket.reserve() == 0:
+            count += 1
+        return count
+
+    def test_one_request_until_the_limit_is_known(self):
+        self.assertEqual(self.bucket.reserve(), 0)
+        self.assertEqual(self.bucket.reserve(), UNKNOWN_LIMIT_POLL)
+        self.bucket.update(response(limit=5, remaining=4))
+        self.assertEqual(self.reserve_all(), 4)
+
+    def test_headers_do_not_count_requests_in_flight(self):
+        self.bucket.reserve()
+        self.bucket.update(response(limit=5, remaining=4))
+        self.assertEqual(self.reserve_all(), 4)
+        # Answered before the other three were counted by Discord
+        self.bucket.update(response(limit=5, remaining=3))
+        self.assertEqual(self.reserve_all(), 0)
+
+    def test_refill_keeps_requests_in_flight_reserved(self):
+        self.bucket.reserve()
+        self.bucket.update(response(limit=5, remaining=4, reset_after=2.0))
+        self.assertEqual(self.reserve_all(), 4)
+        self.assertEqual(self.bucket.reserve(), 2.0)
+        self.now += 2.0
+        # Four requests are still unanswered, only one token is left
+        self.assertEqual(self.reserve_all(), 1)
+        self.assertEqual(self.bucket.in_flight, 5)
+
+    def test_spent_window_waits_for_responses(self):
+        self.bucket.reserve()
+        self.bucket.update(response(limit=2, remaining=1, reset_after=1.0))
+        self.assertEqual(self.reserve_all(), 1)
+        self.now += 5.0
+        # Both tokens of the new window, one is held by the unanswered request
+        self.assertEqual(self.reserve_all(), 1)
+        self.assertEqual(self.bucket.reserve(), UNKNOWN_LIMIT_POLL)
+        self.bucket.update(response(limit=2, remaining=1, reset_after=1.0))
+        self.assertEqual(self.reserve_all(), 0)
+
+    def test_release_returns_the_token(self):
+        self.bucket.reserve()
+        self.bucket.release()
+        self.assertEqual(self.bucket.in_flight, 0)
+        self.assertEqual(self.bucket.reserve(), 0)
+
+    def test_429_empties_the_bucket_for_retry_after(self):
+        self.bucket.reserve()
+        self.assertEqual(self.bucket.update(response(429, remaining=0, retry_after=3)), 3.0)
+        self.assertEqual(self.bucket.reserve(), 3.0)
+        self.now += 3.0
+        self.assertEqual(self.bucket.reserve(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from common import utils
+from common.utils import ExportCache
+
+URL = "https://example.com/export.ashx"
+CSV = b"Ticker,Price\nAAA,1.5\nBBB,\n"
+
+
+class ExportCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        self.directory = os.path.join(self.root.name, "cache")
+        self.cache = ExportCache(self.directory, ttl=60, max_bytes=1024 * 1024)
+
+    def test_disabled_without_ttl(self):
+        cache = ExportCache(self.directory, ttl=0, max_bytes=1024)
+        self.assertFalse(cache.enabled)
+        cache.put_content("key", CSV)
+        self.assertIsNone(cache.get_content("key"))
+        self.assertFalse(os.path.exists(self.directory))
+
+    def test_directory_is_private(self):
+        self.assertTrue(self.cache.enabled)
+        self.assertEqual(os.stat(self.directory).st_mode & 0o777, 0o700)
+
+    @unittest.skipUnless(hasattr(os, "getuid"), "POSIX permissions")
+    def test_shared_directory_is_refused(self):
+        os.makedirs(self.directory)
+        os.chmod(self.directory, 0o777)
+        with self.assertLogs(level="ERROR"):
+            self.assertFalse(self.cache.enabled)
+        self.assertIsNone(self.cache.get_content("key"))
+
+    def test_key_ignores_credentials(self):
+        first = self.cache.key(URL, {"f": "sh_price_u5", "auth": "me"})
+        second = self.cache.key(URL, {"auth": "you", "f": "sh_price_u5"})
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, self.cache.key(URL, {"f": "sh_price_u10"}))
+
+    def test_content_round_trip_and_expiry(self):
+        self.cache.put_content("key", CSV)
+        self.assertEqual(self.cache.get_content("key"), CSV)
+
+        stale = time.time() - 120
+        path = os.path.join(self.directory, "key.csv.gz")
+        os.utime(path, (stale, stale))
+        self.assertIsNone(self.cache.get_content("key"))
+
+    def test_frames_are_kept_per_projection(self):
+        self.cache.put_content("key", CSV)
+        df = pd.DataFrame({"Ticker": ["AAA"]})
+        self.cache.put_frame("key", df, usecols=["Ticker"])
+        pd.testing.assert_frame_equal(self.cache.get_frame("key", ["Ticker"]), df)
+        self.assertIsNone(self.cache.get_frame("key", ["Ticker", "Price"]))
+
+    def test_new_download_drops_parsed_copies(self):
+        self.cache.put_content("key", CSV)
+        self.cache.put_frame("key", pd.DataFrame({"Ticker": ["AAA"]}))
+        self.cache.put_content("key", CSV)
+        self.assertIsNone(self.cache.get_frame("key"))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = self.cache
+        cache.put_content("old", CSV)
+        path = os.path.join(self.directory, "old.csv.gz")
+        stat = os.stat(path)
+        # Room for one entry only
+        cache.max_bytes = stat.st_size * 3 // 2
+        os.utime(path, (time.time() - 30, stat.st_mtime))
+        cache.put_content("new", CSV)
+        self.assertIsNone(cache.get_content("old"))
+        self.assertEqual(cache.get_content("new"), CSV)
+
+
+class FetchCsvAsDataframeTest(unittest.TestCase):
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        cache = ExportCache(os.path.join(root.name, "cache"), ttl=60, max_bytes=1 << 20)
+        patcher = mock.patch.object(utils, "export_cache", cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.http_get = mock.Mock(return_value=mock.Mock(content=CSV))
+        patcher = mock.patch.object(utils, "http_get", self.http_get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_hit_skips_download_and_parse(self):
+        first = utils.fetch_csv_as_dataframe(URL, {"f": "x", "auth": "me"})
+        second = utils.fetch_csv_as_dataframe(URL, {"f": "x", "auth": "you"})
+        self.assertEqual(self.http_get.call_count, 1)
+        pd.testing.assert_frame_equal(first, second)
+        self.assertEqual(list(first["Price"]), [1.5, 0.0])
+
+    def test_projection_reuses_the_download(self):
+        utils.fetch_csv_as_dataframe(URL, {"f": "x"})
+        df = utils.fetch_csv_as_dataframe(URL, {"f": "x"}, usecols=["Ticker"])
+        self.assertEqual(self.http_get.call_count, 1)
+        self.assertEqual(list(df.columns), ["Ticker"])
+
+
+if __name__ == "__main__":
+    unittest.main()
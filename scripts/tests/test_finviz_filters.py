@@ -0,0 +1,85 @@
+import unittest
+
+import pandas as pd
+
+from common.finviz_filters import (
+    UnsupportedFilterError,
+    compile_filter_token,
+    compile_filters,
+)
+
+
+def universe():
+    return pd.DataFrame(
+        {
+            "Ticker": ["AAA", "BBB", "CCC", "DDD"],
+            "Price": [5.0, 25.0, 40.0, None],
+            "Relative Volume": [6.0, 1.0, 5.5, 8.0],
+            "Market Cap": [150.0, 2500.0, 12000.0, 250000.0],
+            "Change": [0.2, -0.05, 0.15, 0.0],
+            "Relative Strength Index (14)": [75.0, 40.0, 71.0, 20.0],
+            "Optionable": ["Yes", "No", "Yes", "Yes"],
+            "Shortable": ["Yes", "Yes", "No", "Yes"],
+            "50-Day Simple Moving Average": [0.1, -0.1, 0.05, 0.0],
+            "200-Day Simple Moving Average": [0.2, -0.2, 0.01, 0.0],
+            "Earnings Date": ["2024-05-06", "2024-05-03", "2024-05-07", None],
+        }
+    )
+
+
+def selected(filter_params, df=None, **kwargs):
+    df = universe() if df is None else df
+    return list(df["Ticker"][compile_filters(filter_params, **kwargs)(df)])
+
+
+class CompileFiltersTest(unittest.TestCase):
+    def test_numeric_bounds(self):
+        self.assertEqual(selected("sh_price_u30"), ["AAA", "BBB"])
+        self.assertEqual(selected("sh_price_10to40"), ["BBB", "CCC"])
+        self.assertEqual(selected("sh_relvol_o5"), ["AAA", "CCC", "DDD"])
+
+    def test_tokens_are_anded(self):
+        self.assertEqual(selected("sh_price_u30,sh_relvol_o5"), ["AAA"])
+        self.assertEqual(selected(" sh_price_u30 , ,sh_relvol_o5 "), ["AAA"])
+
+    def test_empty_filter_keeps_everything(self):
+        self.assertEqual(selected(""), ["AAA", "BBB", "CCC", "DDD"])
+
+    def test_market_cap(self):
+        self.assertEqual(selected("cap_mid"), ["BBB"])
+        self.assertEqual(selected("cap_largeover"), ["CCC", "DDD"])
+
+    def test_performance_in_percent(self):
+        self.assertEqual(selected("ta_perf_d15o"), ["AAA", "CCC"])
+        self.assertEqual(selected("ta_perf_dup"), ["AAA", "CCC"])
+
+    def test_rsi_and_options(self):
+        self.assertEqual(selected("ta_rsi_ob70"), ["AAA", "CCC"])
+        self.assertEqual(selected("sh_opt_optionshort"), ["AAA", "DDD"])
+
+    def test_sma_crossings(self):
+        self.assertEqual(selected("ta_sma50_pa"), ["AAA", "CCC"])
+        # SMA50 is above SMA200 when the price is less far above SMA50
+        self.assertEqual(selected("ta_sma50_sa200"), ["AAA"])
+
+    def test_earnings_date(self):
+        today = pd.Timestamp("2024-05-06")
+        self.assertEqual(selected("earningsdate_today", today=today), ["AAA"])
+        # The previous business day of a Monday is the Friday
+        self.assertEqual(selected("earningsdate_yesterday", today=today), ["BBB"])
+        self.assertEqual(selected("earningsdate_tomorrow", today=today), ["CCC"])
+
+    def test_unsupported_token(self):
+        with self.assertRaises(UnsupportedFilterError):
+            compile_filter_token("sh_price_weird")
+        with self.assertRaises(UnsupportedFilterError):
+            compile_filter_token("geo_usa")
+
+    def test_missing_column_is_unsupported(self):
+        predicate = compile_filters("fa_pe_u20")
+        with self.assertRaises(UnsupportedFilterError):
+            predicate(universe())
+
+
+if __name__ == "__main__":
+    unittest.main()
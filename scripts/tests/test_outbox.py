@@ -0,0 +1,36 @@
+import unittest
+from unittest import mock
+
+from common.outbox import OUTBOX_MAX_ATTEMPTS, is_permanent_failure, mark_failed
+
+
+class MarkFailedTest(unittest.TestCase):
+    def mark_failed(self, attempts, permanent=False):
+        connection, cursor = mock.Mock(), mock.Mock()
+        mark_failed(connection, cursor, 7, attempts, "error", permanent)
+        connection.commit.assert_called_once_with()
+        status, backoff, error, message_id = cursor.execute.call_args[0][1]
+        self.assertEqual((error, message_id), ("error", 7))
+        return status, backoff
+
+    def test_retried_with_backoff(self):
+        self.assertEqual(self.mark_failed(1), ("pending", 10))
+        self.assertEqual(self.mark_failed(2), ("pending", 20))
+
+    def test_given_up_after_the_last_attempt(self):
+        self.assertEqual(self.mark_failed(OUTBOX_MAX_ATTEMPTS), ("failed", 0))
+
+    def test_permanent_failures_are_not_retried(self):
+        self.assertEqual(self.mark_failed(1, permanent=True), ("failed", 0))
+
+
+class PermanentFailureTest(unittest.TestCase):
+    def test_client_errors_except_rate_limits(self):
+        for status in (400, 401, 403, 404, 413):
+            self.assertTrue(is_permanent_failure(status), status)
+        for status in (429, 500, 502, 503):
+            self.assertFalse(is_permanent_failure(status), status)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from common import columns
+from common.columns import convert_columns, parse_numbers
+
+
+class ParseNumbersTest(unittest.TestCase):
+    """Runs against the Arrow parser, PandasParseNumbersTest against the fallback"""
+
+    def assertNumbers(self, values, expected, **kwargs):
+        np.testing.assert_array_equal(parse_numbers(values, **kwargs), expected)
+
+    def test_plain_numbers(self):
+        self.assertNumbers(["1", "-2.5", ".5", "1e3", "+4"], [1, -2.5, 0.5, 1000, 4])
+
+    def test_separators_and_percent_signs(self):
+        self.assertNumbers(["1,234", "12.5%", "-0.75%", "1,000,000"], [1234, 12.5, -0.75, 1e6])
+
+    def test_suffixes(self):
+        self.assertNumbers(["3.2B", "15K", "1.5M", "2T", "7"], [3.2e9, 15e3, 1.5e6, 2e12, 7])
+
+    def test_padded_values(self):
+        self.assertNumbers(["12.5% ", " 7 ", "\t3.2B", " 1,234 "], [12.5, 7, 3.2e9, 1234])
+
+    def test_placeholders(self):
+        self.assertNumbers(["-", "", None, "nan", "None", "  "], [np.nan] * 6)
+        # empty only stands in for empty and null cells
+        self.assertNumbers(["-", "", None, "5"], [np.nan, 0, 0, 5], empty=0.0)
+
+    def test_mixed_garbage(self):
+        self.assertNumbers(
+            ["abc", "1.2.3", "12%x", "B", "4", "--"], [np.nan] * 4 + [4, np.nan]
+        )
+
+    def test_non_finite_values_are_missing(self):
+        self.assertNumbers(["inf", "-inf", "Infinity", "1"], [np.nan, np.nan, np.nan, 1])
+
+    def test_numbers_pass_through(self):
+        self.assertNumbers([1.5, 2, np.nan], [1.5, 2, np.nan])
+
+    def test_arrow_input(self):
+        if columns.pa is None:
+            self.skipTest("pyarrow is not installed")
+        chunks = columns.pa.chunked_array([["1", " 2% "], [None, "3K"]])
+        self.assertNumbers(chunks, [1, 2, np.nan, 3000])
+
+
+class PandasParseNumbersTest(ParseNumbersTest):
+    def setUp(self):
+        patcher = mock.patch.object(columns, "pa", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_arrow_input(self):
+        self.skipTest("Arrow input needs pyarrow")
+
+
+class ConvertColumnsTest(unittest.TestCase):
+    def test_columns_get_their_final_dtypes(self):
+        df = pd.DataFrame(
+            {
+                "Change": ["12.5% ", "-", "inf"],
+                "Market Cap": ["1.5B", " 300M", "garbage"],
+                "Volume": ["1,234", " 7 ", ""],
+                "Sector": ["Energy", None, "Energy"],
+            },
+            dtype=object,
+        )
+        df = convert_columns(df)
+        np.testing.assert_array_equal(df["Change"], [0.125, np.nan, np.nan])
+        np.testing.assert_array_equal(df["Market Cap"], [1.5e9, 3e8, np.nan])
+        self.assertEqual(str(df["Volume"].dtype), "Int64")
+        self.assertEqual(list(df["Volume"].fillna(-1)), [1234, 7, -1])
+        self.assertEqual(list(df["Sector"]), ["Energy", "N/A", "Energy"])
+
+
+if __name__ == "__main__":
+    unittest.main()
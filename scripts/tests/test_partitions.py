@@ -0,0 +1,99 @@
+import unittest
+from datetime import date, datetime, timezone
+from unittest import mock
+
+from common.partitions import (
+    add_months,
+    drop_partitions_before,
+    ensure_monthly_partitions,
+    month_start,
+    partition_bounds,
+    partition_name,
+)
+
+TABLE = "alerts_alertevent"
+
+
+def cursor_with(partitions):
+    cursor = mock.Mock()
+    cursor.fetchall.return_value = [(name,) for name in partitions]
+    return cursor
+
+
+def executed(cursor):
+    return [call.args for call in cursor.execute.call_args_list[1:]]
+
+
+class MonthTest(unittest.TestCase):
+    def test_month_start(self):
+        self.assertEqual(month_start(datetime(2025, 3, 31, 23, 59)), date(2025, 3, 1))
+
+    def test_add_months_across_years(self):
+        self.assertEqual(add_months(date(2025, 11, 1), 2), date(2026, 1, 1))
+        self.assertEqual(add_months(date(2025, 1, 1), -1), date(2024, 12, 1))
+
+    def test_names_and_bounds(self):
+        month = date(2025, 12, 1)
+        self.assertEqual(partition_name(TABLE, month), "alerts_alertevent_y2025m12")
+        self.assertEqual(
+            partition_bounds(month),
+            ("2025-12-01 00:00:00+00", "2026-01-01 00:00:00+00"),
+        )
+
+
+class EnsureMonthlyPartitionsTest(unittest.TestCase):
+    def test_creates_only_missing_months(self):
+        connection = mock.Mock()
+        cursor = cursor_with(["alerts_alertevent_y2025m12"])
+        created = ensure_monthly_partitions(
+            connection,
+            cursor,
+            TABLE,
+            start=datetime(2025, 12, 15, tzinfo=timezone.utc),
+            months_ahead=2,
+        )
+        self.assertEqual(
+            created, ["alerts_alertevent_y2026m01", "alerts_alertevent_y2026m02"]
+        )
+        (query, bounds), _ = executed(cursor)
+        self.assertIn("alerts_alertevent_y2026m01 PARTITION OF alerts_alertevent", query)
+        self.assertEqual(bounds, ("2026-01-01 00:00:00+00", "2026-02-01 00:00:00+00"))
+        connection.commit.assert_called_once_with()
+
+    def test_nothing_to_create(self):
+        cursor = cursor_with(["alerts_alertevent_y2025m03", "alerts_alertevent_y2025m04"])
+        created = ensure_monthly_partitions(
+            mock.Mock(), cursor, TABLE, start=date(2025, 3, 2), commit=False
+        )
+        self.assertEqual(created, [])
+        self.assertEqual(executed(cursor), [])
+
+
+class DropPartitionsBeforeTest(unittest.TestCase):
+    def test_drops_whole_months_before_the_cutoff(self):
+        cursor = cursor_with(
+            [
+                "alerts_alertevent_y2025m02",
+                "alerts_alertevent_y2024m12",
+                "alerts_alertevent_y2025m03",
+                "alerts_alertevent_y2025m04",
+                "alerts_alertevent_default",
+            ]
+        )
+        dropped = drop_partitions_before(
+            mock.Mock(), cursor, TABLE, before=date(2025, 3, 20)
+        )
+        self.assertEqual(
+            dropped, ["alerts_alertevent_y2024m12", "alerts_alertevent_y2025m02"]
+        )
+        self.assertEqual(
+            executed(cursor),
+            [
+                ("DROP TABLE alerts_alertevent_y2024m12",),
+                ("DROP TABLE alerts_alertevent_y2025m02",),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from common import columns
+from common.columns import read_finviz_csv
+
+EXPORT = (
+    "﻿"
+    '"No.","Ticker","Company","Sector","Market Cap","Change","Volume","Notes"\n'
+    '1,"AAA","A, Inc.","Technology","1.5B","12.50%","1,234","x"\n'
+    '2,"BBB","","Energy","","-3.00%","","y"\n'
+    '3,"CCC","C Corp","Technology","300M","-","7",""\n'
+).encode("utf-8")
+
+
+class ReadFinvizCsvTest(unittest.TestCase):
+    def read(self, usecols=None):
+        return read_finviz_csv(EXPORT, usecols)
+
+    def test_columns_in_header_order(self):
+        self.assertEqual(
+            list(self.read().columns),
+            ["No.", "Ticker", "Company", "Sector", "Market Cap", "Change", "Volume", "Notes"],
+        )
+
+    def test_numbers_get_their_final_dtypes(self):
+        df = self.read()
+        np.testing.assert_array_equal(df["Market Cap"], [1.5e9, 0.0, 3e8])
+        # Percentages become fractions, "-" is missing
+        np.testing.assert_array_equal(df["Change"], [0.125, -0.03, np.nan])
+        self.assertEqual(str(df["Volume"].dtype), "Int64")
+        self.assertEqual(list(df["Volume"]), [1234, 0, 7])
+
+    def test_text_and_categories(self):
+        df = self.read()
+        self.assertEqual(list(df["Company"]), ["A, Inc.", "N/A", "C Corp"])
+        self.assertIsInstance(df["Company"].dtype, pd.StringDtype)
+        self.assertIsInstance(df["Sector"].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(df["Sector"]), ["Technology", "Energy", "Technology"])
+
+    def test_projection(self):
+        df = self.read(usecols=["Ticker", "Change", "Missing"])
+        self.assertEqual(list(df.columns), ["Ticker", "Change"])
+        self.assertTrue(read_finviz_csv(EXPORT, ["Missing"]).empty)
+
+    def test_unregistered_columns_keep_inferred_types(self):
+        df = self.read()
+        self.assertEqual(list(df["No."]), [1, 2, 3])
+        self.assertEqual(list(df["Notes"]), ["x", "y", 0])
+
+
+class PandasReadFinvizCsvTest(unittest.TestCase):
+    """Without pyarrow the same export comes out with the same values"""
+
+    def test_matches_the_arrow_reader(self):
+        if columns.pa_csv is None:
+            self.skipTest("pyarrow is not installed")
+        wanted = ["Ticker", "Company", "Sector", "Market Cap", "Change", "Volume"]
+        arrow = read_finviz_csv(EXPORT, wanted)
+        with mock.patch.object(columns, "pa_csv", None):
+            fallback = read_finviz_csv(EXPORT, wanted)
+        pd.testing.assert_frame_equal(
+            arrow.astype(object), fallback[arrow.columns].astype(object), check_dtype=False
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
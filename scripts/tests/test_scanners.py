@@ -0,0 +1,35 @@
+import unittest
+
+from common.base_scanner import BaseScanner
+from common.scanners import load_scanner_classes, scanner_directories
+
+BOTS = [
+    "1_earnings_discord_bot",
+    "2_strong_earnings_bot",
+    "3_momentum_gap_bot",
+    "4_short_squeeze_bot",
+    "5_technical_ma_bot",
+    "6_steady_performance_bot",
+    "7_CNBC_growth_scanner_bot",
+]
+
+
+class LoadScannerClassesTest(unittest.TestCase):
+    def test_only_the_scanner_bots(self):
+        # Neither the orchestrator nor the outbox worker
+        self.assertEqual(list(scanner_directories()), BOTS)
+
+    def test_one_scanner_per_bot(self):
+        classes = load_scanner_classes()
+        self.assertEqual(len(classes), len(BOTS))
+        for cls in classes:
+            self.assertTrue(issubclass(cls, BaseScanner))
+
+    def test_select_by_directory_or_class_name(self):
+        (by_directory,) = load_scanner_classes(["3_momentum_gap_bot"])
+        (by_name,) = load_scanner_classes([by_directory.__name__])
+        self.assertEqual(by_name.__name__, by_directory.__name__)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+import pandas as pd
+
+from common.base_scanner import BaseScanner
+from common.snapshot_diff import CHANGED, ENTERED, UNCHANGED, diff_snapshots
+
+COLUMNS = {"Price": 0.5}
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=["Ticker", "Price"])
+
+
+class DiffSnapshotsTest(unittest.TestCase):
+    def test_without_previous_everything_entered(self):
+        diff = diff_snapshots(frame([("AAA", 1.0), ("BBB", 2.0)]), None, COLUMNS)
+        self.assertEqual(list(diff.status), [ENTERED, ENTERED])
+        self.assertTrue(diff.exited.empty)
+
+    def test_empty_previous_everything_entered(self):
+        diff = diff_snapshots(frame([("AAA", 1.0), ("BBB", 2.0)]), frame([]), COLUMNS)
+        self.assertEqual(list(diff.status), [ENTERED, ENTERED])
+        self.assertTrue(diff.exited.empty)
+
+    def test_empty_current_everything_exited(self):
+        diff = diff_snapshots(frame([]), frame([("AAA", 1.0), ("BBB", 2.0)]), COLUMNS)
+        self.assertEqual(len(diff.status), 0)
+        self.assertEqual(list(diff.exited["Ticker"]), ["AAA", "BBB"])
+
+    def test_both_empty(self):
+        diff = diff_snapshots(frame([]), frame([]), COLUMNS)
+        self.assertEqual(diff.counts(), {ENTERED: 0, CHANGED: 0, UNCHANGED: 0, "exited": 0})
+
+    def test_changes_beyond_tolerance(self):
+        previous = frame([("AAA", 1.0), ("BBB", 2.0), ("CCC", 3.0)])
+        current = frame([("AAA", 1.2), ("BBB", 3.0), ("DDD", 4.0)])
+        diff = diff_snapshots(current, previous, COLUMNS)
+        self.assertEqual(list(diff.status), [UNCHANGED, CHANGED, ENTERED])
+        self.assertEqual(list(diff.exited["Ticker"]), ["CCC"])
+
+
+class DiffScanner(BaseScanner):
+    DIFF_COLUMNS = COLUMNS
+
+
+class SelectChangesTest(unittest.TestCase):
+    def test_without_baseline_warns_and_passes_everything(self):
+        scanner = DiffScanner("webhook")
+        current = frame([("AAA", 1.0), ("BBB", 2.0)])
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(len(scanner.select_changes(current)), 2)
+        # The next run diffs against this one
+        selected = scanner.select_changes(frame([("AAA", 1.0), ("BBB", 3.0)]))
+        self.assertEqual(list(selected["Ticker"]), ["BBB"])
+
+
+if __name__ == "__main__":
+    unittest.main()
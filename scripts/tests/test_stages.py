@@ -0,0 +1,104 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from common.base_scanner import BaseScanner
+
+EXPORT = pd.DataFrame(
+    {
+        "Ticker": ["AAA", "BBB", "CCC"],
+        "Company": ["A Inc", "B Corp", "C Ltd"],
+        "Exchange": ["NASDAQ", "NYSE", "NYSE"],
+        "Sector": ["Technology", "Energy", "Energy"],
+        "Industry": ["Software", "Oil", "Gas"],
+        "Market Cap": ["1.5B", "300M", "2B"],
+        "Price": ["10.50", "3.20", "7"],
+        "Change": ["12.50%", "-3.00%", "1.00%"],
+        "Volume": ["1,234", "500", "-"],
+        "Average Volume": ["1,000", "400", "10"],
+        "Relative Volume": ["1.2", "1.25", "0.5"],
+    }
+)
+
+
+class RecordingScanner(BaseScanner):
+    def __init__(self):
+        super().__init__("webhook")
+        self.stages = []
+        self.payloads = []
+        self.delivery = "sync"
+        self.discord_sink = lambda scanner, payload: self.payloads.append(payload)
+
+    def transform(self, df):
+        self.stages.append("transform")
+        df = super().transform(df)
+        df["Gap"] = df["Change"] * 100
+        return df
+
+    def select(self, df):
+        self.stages.append("select")
+        return super().select(df[df["Change"] > 0])
+
+    def persist(self, df):
+        self.stages.append("persist")
+        return super().persist(df)
+
+    def notify(self, stocks):
+        self.stages.append("notify")
+        super().notify(stocks)
+
+    def get_alert_type(self):
+        return "recording"
+
+    def get_alert_data(self, stock):
+        return {"gap": stock["Gap"]}
+
+    def create_discord_alert(self, stocks):
+        for stock in stocks:
+            self.send_discord_message({"title": stock["Ticker"]})
+
+
+class StagesTest(unittest.TestCase):
+    def setUp(self):
+        self.scanner = RecordingScanner()
+        patcher = mock.patch.object(self.scanner, "bulk_db_operations")
+        self.bulk_db_operations = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_stages_run_in_order(self):
+        self.scanner.run_scanner(snapshot=EXPORT)
+        self.assertEqual(
+            self.scanner.stages, ["transform", "select", "persist", "notify"]
+        )
+        self.assertEqual(
+            self.scanner.payloads, [{"embeds": [{"title": "AAA"}, {"title": "CCC"}]}]
+        )
+
+    def test_persist_writes_the_selected_stocks_in_one_batch(self):
+        self.scanner.run_scanner(snapshot=EXPORT)
+        self.bulk_db_operations.assert_called_once()
+        stocks, stock_info, alerts, quotes = self.bulk_db_operations.call_args.args
+        self.assertEqual([row[0] for row in stocks], ["AAA", "CCC"])
+        self.assertEqual(stock_info[0][:5], ("AAA", 1.5e9, 1000, 10.5, 1234))
+        # The "-" placeholder is stored as NULL
+        self.assertIsNone(stock_info[1][4])
+        self.assertEqual(
+            [alert[:2] for alert in alerts], [("AAA", "recording"), ("CCC", "recording")]
+        )
+        self.assertEqual(alerts[0][3], {"gap": 12.5})
+        self.assertEqual(len(quotes), 2)
+
+    def test_nothing_selected_skips_persist_and_notify(self):
+        self.scanner.run_scanner(snapshot=EXPORT[EXPORT["Ticker"] == "BBB"])
+        self.assertEqual(self.scanner.stages, ["transform", "select", "persist"])
+        self.assertEqual(self.scanner.payloads, [])
+
+    def test_the_snapshot_is_not_modified(self):
+        before = EXPORT.copy()
+        self.scanner.run_scanner(snapshot=EXPORT)
+        pd.testing.assert_frame_equal(EXPORT, before)
+
+
+if __name__ == "__main__":
+    unittest.main()
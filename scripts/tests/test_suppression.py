@@ -0,0 +1,66 @@
+import json
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from common.suppression import AlertIndex, Realert
+
+NOW = datetime(2025, 3, 10, 12, 0, tzinfo=timezone.utc)
+COOLDOWN = timedelta(days=3)
+
+
+def index():
+    return AlertIndex.from_rows(
+        [
+            ("AAA", NOW - timedelta(days=1), {"change": 0.10, "price": 50.0}),
+            ("BBB", NOW - timedelta(days=5), {"change": 0.10, "price": 50.0}),
+            # Plain json columns arrive as text
+            ("CCC", NOW - timedelta(hours=2), json.dumps({"change": 0.20})),
+        ],
+        data_keys=["change", "price"],
+    )
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=["Ticker", "Change", "Price"])
+
+
+class AlertIndexTest(unittest.TestCase):
+    def suppressed(self, df, realert=()):
+        return list(index().suppressed(df, COOLDOWN, realert, now=NOW))
+
+    def test_cooldown(self):
+        df = frame([("AAA", 0.1, 50.0), ("BBB", 0.1, 50.0), ("DDD", 0.1, 50.0)])
+        # BBB's alert is older than the cooldown, DDD never alerted
+        self.assertEqual(self.suppressed(df), [True, False, False])
+
+    def test_absolute_move_lifts_the_cooldown(self):
+        df = frame([("AAA", 0.16, 50.0), ("AAA", 0.14, 50.0), ("CCC", 0.0, 1.0)])
+        rules = [Realert("Change", "change", 0.05)]
+        self.assertEqual(self.suppressed(df, rules), [False, True, False])
+
+    def test_relative_move_lifts_the_cooldown(self):
+        df = frame([("AAA", 0.1, 56.0), ("AAA", 0.1, 54.0)])
+        rules = [Realert("Price", "price", 0.10, relative=True)]
+        self.assertEqual(self.suppressed(df, rules), [False, True])
+
+    def test_metrics_not_stored_never_count_as_moved(self):
+        # CCC was alerted without a price, AAA has no current price
+        df = frame([("CCC", 0.2, 500.0), ("AAA", 0.1, float("nan"))])
+        rules = [Realert("Price", "price", 0.10, relative=True)]
+        self.assertEqual(self.suppressed(df, rules), [True, True])
+
+    def test_naive_now_is_utc(self):
+        df = frame([("AAA", 0.1, 50.0)])
+        now = NOW.replace(tzinfo=None) + timedelta(days=2, hours=1)
+        self.assertEqual(list(index().suppressed(df, COOLDOWN, now=now)), [False])
+
+    def test_empty_index(self):
+        df = frame([("AAA", 0.1, 50.0)])
+        empty = AlertIndex.empty(["change"])
+        self.assertEqual(list(empty.suppressed(df, COOLDOWN, now=NOW)), [False])
+
+
+if __name__ == "__main__":
+    unittest.main()
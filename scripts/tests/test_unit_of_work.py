@@ -0,0 +1,120 @@
+import unittest
+
+import psycopg2
+from psycopg2 import errorcodes
+
+from common.utils import UnitOfWork
+
+
+class Deadlock(psycopg2.Error):
+    pgcode = errorcodes.DEADLOCK_DETECTED
+    pgerror = "deadlock detected"
+
+
+class ForeignKeyViolation(psycopg2.Error):
+    pgcode = errorcodes.FOREIGN_KEY_VIOLATION
+    pgerror = "violates foreign key constraint"
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, query, params=None):
+        self.connection.log.append(query)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeConnection:
+    def __init__(self):
+        self.log = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.log.append("COMMIT")
+
+    def rollback(self):
+        self.log.append("ROLLBACK")
+
+
+def step(name, failures=()):
+    """A step that raises the given errors on its first calls"""
+    failures = list(failures)
+
+    def run(connection, cursor, *args, commit=True, **kwargs):
+        assert commit is False
+        if failures:
+            raise failures.pop(0)
+        cursor.execute(name)
+        return args
+
+    run.__name__ = name
+    return run
+
+
+class UnitOfWorkTest(unittest.TestCase):
+    def setUp(self):
+        self.connection = FakeConnection()
+        self.work = UnitOfWork(self.connection, retries=2)
+
+    def test_steps_commit_once_under_savepoints(self):
+        self.work.add(step("stocks"), 1, 2)
+        self.work.add(step("alerts"))
+        self.assertEqual(self.work.commit(), [])
+        self.assertEqual(
+            self.connection.log,
+            [
+                "SET CONSTRAINTS ALL IMMEDIATE",
+                "SAVEPOINT step_0",
+                "stocks",
+                "RELEASE SAVEPOINT step_0",
+                "SAVEPOINT step_1",
+                "alerts",
+                "RELEASE SAVEPOINT step_1",
+                "COMMIT",
+            ],
+        )
+        self.assertEqual(self.work.results, [("stocks", (1, 2)), ("alerts", ())])
+
+    def test_non_critical_steps_skip_the_wal_flush(self):
+        self.work.add(step("info"), critical=False)
+        self.work.commit()
+        self.assertIn("SET LOCAL synchronous_commit = off", self.connection.log)
+
+    def test_retryable_failures_are_retried(self):
+        self.work.add(step("stocks", [Deadlock(), Deadlock()]))
+        self.assertEqual(self.work.commit(), [])
+        self.assertEqual(self.connection.log.count("ROLLBACK TO SAVEPOINT step_0"), 2)
+        self.assertEqual(self.connection.log[-1], "COMMIT")
+
+    def test_failed_non_critical_step_is_skipped(self):
+        self.work.add(step("info", [ForeignKeyViolation()]), critical=False)
+        self.work.add(step("alerts"))
+        with self.assertLogs(level="ERROR"):
+            self.assertEqual(self.work.commit(), ["info"])
+        self.assertIn("ROLLBACK TO SAVEPOINT step_0", self.connection.log)
+        self.assertEqual(self.connection.log[-2:], ["RELEASE SAVEPOINT step_1", "COMMIT"])
+
+    def test_failed_critical_step_rolls_back(self):
+        self.work.add(step("stocks"))
+        self.work.add(step("alerts", [Deadlock()] * 3))
+        with self.assertRaises(Deadlock):
+            self.work.commit()
+        self.assertEqual(self.connection.log.count("SAVEPOINT step_1"), 3)
+        self.assertEqual(self.connection.log[-1], "ROLLBACK")
+        self.assertNotIn("COMMIT", self.connection.log)
+
+    def test_nothing_queued(self):
+        self.assertEqual(self.work.commit(), [])
+        self.assertEqual(self.connection.log, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from common import universe
+
+TICK = universe.UNIVERSE_TICK_SECONDS
+
+
+def export():
+    return pd.DataFrame({"Ticker": ["AAA", "BBB"], "Price": [1.0, 2.0]})
+
+
+class UniverseSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.downloads = mock.Mock(side_effect=lambda email: export())
+        for patcher in (
+            mock.patch.object(universe, "download_universe", self.downloads),
+            mock.patch.object(universe, "archive_snapshot"),
+            mock.patch.dict(
+                universe._snapshot,
+                {"tick": None, "df": None, "typed": None, "downloaded": False},
+            ),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def share(self, directory):
+        patcher = mock.patch.object(universe, "UNIVERSE_SNAPSHOT_DIR", directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def forget(self):
+        """Start over like a new process"""
+        universe._snapshot.update(tick=None, df=None, typed=None, downloaded=False)
+
+    def test_downloads_once_per_tick(self):
+        self.share(None)
+        first = universe.get_universe_snapshot("me", now=10 * TICK)
+        second = universe.get_universe_snapshot("me", now=10 * TICK + 1)
+        self.assertEqual(self.downloads.call_count, 1)
+        pd.testing.assert_frame_equal(first, second)
+
+        universe.get_universe_snapshot("me", now=11 * TICK)
+        self.assertEqual(self.downloads.call_count, 2)
+
+    def test_callers_get_their_own_copy(self):
+        self.share(None)
+        df = universe.get_universe_snapshot("me", now=10 * TICK)
+        df.loc[0, "Price"] = 99.0
+        again = universe.get_universe_snapshot("me", now=10 * TICK)
+        self.assertEqual(again.loc[0, "Price"], 1.0)
+
+    def test_not_shared_stays_in_memory(self):
+        self.share(None)
+        self.assertFalse(universe.universe_snapshot_shared())
+        universe.get_universe_snapshot("me", now=10 * TICK)
+        self.assertIsNone(universe.read_snapshot(10))
+
+    def test_shared_directory_skips_the_download(self):
+        self.share(self.directory.name)
+        self.assertTrue(universe.universe_snapshot_shared())
+        universe.get_universe_snapshot("me", now=10 * TICK)
+        self.assertEqual(os.listdir(self.directory.name), ["universe_10.pkl"])
+
+        self.forget()
+        df = universe.get_universe_snapshot("me", now=10 * TICK)
+        self.assertEqual(self.downloads.call_count, 1)
+        pd.testing.assert_frame_equal(df, export())
+
+    def test_older_ticks_are_removed(self):
+        self.share(self.directory.name)
+        universe.get_universe_snapshot("me", now=10 * TICK)
+        universe.get_universe_snapshot("me", now=11 * TICK)
+        self.assertEqual(os.listdir(self.directory.name), ["universe_11.pkl"])
+
+    def test_typed_frame_is_converted_once_and_archived_by_the_downloader(self):
+        self.share(None)
+        process_columns = mock.Mock(side_effect=lambda df: df.assign(Typed=True))
+        universe.get_typed_universe_snapshot("me", process_columns, now=10 * TICK)
+        raw, typed = universe.get_typed_universe_snapshot(
+            "me", process_columns, now=10 * TICK
+        )
+        self.assertEqual(process_columns.call_count, 1)
+        self.assertNotIn("Typed", raw.columns)
+        self.assertTrue(typed["Typed"].all())
+        universe.archive_snapshot.assert_called_once()
+
+    def test_empty_download_is_unavailable(self):
+        self.share(None)
+        self.downloads.side_effect = lambda email: pd.DataFrame()
+        self.assertIsNone(universe.get_universe_snapshot("me", now=10 * TICK))
+        self.assertEqual(
+            universe.get_typed_universe_snapshot("me", mock.Mock(), now=10 * TICK),
+            (None, None),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("stocks", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="stock",
+            name="content_hash",
+            field=models.CharField(blank=True, default="", max_length=32),
+        ),
+        migrations.AddField(
+            model_name="stockinfo",
+            name="content_hash",
+            field=models.CharField(blank=True, default="", max_length=32),
+        ),
+    ]
@@ -0,0 +1,76 @@
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Django cannot create partitioned tables, so the table is created here and
+# the model state is declared separately. Partitions are created per month
+# by the scanners (scripts/common/partitions.py) before they write.
+# Fixed width columns come first so rows carry no alignment padding.
+CREATE_STOCK_QUOTE = """
+CREATE TABLE stocks_stockquote (
+    ts timestamp with time zone NOT NULL,
+    id bigserial NOT NULL,
+    price double precision NULL,
+    change double precision NULL,
+    volume bigint NULL,
+    rel_volume double precision NULL,
+    market_cap double precision NULL,
+    stock_id varchar(10) NOT NULL
+        REFERENCES stocks_stock (ticker) DEFERRABLE INITIALLY DEFERRED
+) PARTITION BY RANGE (ts);
+
+CREATE INDEX stocks_quote_ts_brin ON stocks_stockquote USING brin (ts);
+CREATE INDEX stocks_quote_stock_ts_idx
+    ON stocks_stockquote (stock_id, ts) INCLUDE (price, volume);
+"""
+
+DROP_STOCK_QUOTE = "DROP TABLE stocks_stockquote;"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("stocks", "0002_content_hash"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(CREATE_STOCK_QUOTE, DROP_STOCK_QUOTE),
+            ],
+            state_operations=[
+                migrations.CreateModel(
+                    name="StockQuote",
+                    fields=[
+                        ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                        ("ts", models.DateTimeField()),
+                        ("price", models.FloatField(null=True)),
+                        ("change", models.FloatField(null=True)),
+                        ("volume", models.BigIntegerField(null=True)),
+                        ("rel_volume", models.FloatField(null=True)),
+                        ("market_cap", models.FloatField(null=True)),
+                        (
+                            "stock",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="quotes",
+                                to="stocks.stock",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "indexes": [
+                            django.contrib.postgres.indexes.BrinIndex(
+                                fields=["ts"], name="stocks_quote_ts_brin"
+                            ),
+                            models.Index(
+                                fields=["stock", "ts"],
+                                include=["price", "volume"],
+                                name="stocks_quote_stock_ts_idx",
+                            ),
+                        ],
+                    },
+                ),
+            ],
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.indexes import BrinIndex
 from django.db import models
 
 
@@ -7,6 +8,8 @@ class Stock(models.Model):
     exchange = models.CharField(max_length=20)
     sector = models.CharField(max_length=100)
     industry = models.CharField(max_length=100)
+    # md5 of the upserted values, lets the scanners skip unchanged rows
+    content_hash = models.CharField(max_length=32, blank=True, default="")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -20,7 +23,40 @@ class StockInfo(models.Model):
     avg_volume = models.BigIntegerField()
     current_price = models.DecimalField(max_digits=10, decimal_places=2)
     current_volume = models.BigIntegerField()
+    content_hash = models.CharField(max_length=32, blank=True, default="")
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.stock.ticker
+
+
+class StockQuote(models.Model):
+    """
+    Time series of the quotes every scanner run saw, StockInfo only keeps
+    the latest. Range partitioned by month on ts (see migration 0003) and
+    written with COPY. The table has no primary key index in the database,
+    id is unique through its sequence.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    stock = models.ForeignKey(Stock, related_name="quotes", on_delete=models.CASCADE)
+    ts = models.DateTimeField()
+    price = models.FloatField(null=True)
+    change = models.FloatField(null=True)
+    volume = models.BigIntegerField(null=True)
+    rel_volume = models.FloatField(null=True)
+    market_cap = models.FloatField(null=True)
+
+    class Meta:
+        indexes = [
+            BrinIndex(fields=["ts"], name="stocks_quote_ts_brin"),
+            # Covers price charts with index-only scans
+            models.Index(
+                fields=["stock", "ts"],
+                include=["price", "volume"],
+                name="stocks_quote_stock_ts_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.stock_id} {self.ts}"